@@ -17,6 +17,7 @@ SETTINGS = {
     "isolation-pvp": {
         "required": {
             "competition_agent": {"ext": ["py"], "size": 0.2},
+            "game_agent": {"ext": ["py"], "size": 0.2},
         },
         "optional": {
             "data": {"ext": ["json"], "size": 4}
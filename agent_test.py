@@ -3,11 +3,25 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import gc
+import multiprocessing
+import pickle
+import os
+import random
+import tempfile
+import time
+import timeit
 import unittest
 
 import isolation
+import isolation.endgame
+import isolation.playout
+import competition_agent
 import game_agent
+import ratings
+import records
 import sample_players
+import tournament
 
 from importlib import reload
 
@@ -257,6 +271,1505 @@ class MinimaxPlayerTest(unittest.TestCase):
 #         return score.get((player_1_location, player_2_location), default_score)
 
 
+class BitBoardTest(unittest.TestCase):
+    """Unit tests for the bitboard game engine"""
+
+    def test_matches_board_through_random_games(self):
+        for width, height in [(7, 7), (5, 8), (9, 4)]:
+            # Arrange
+            player_1 = sample_players.RandomPlayer()
+            player_2 = sample_players.RandomPlayer()
+            board = isolation.Board(player_1, player_2, width, height)
+            bitboard = isolation.BitBoard(player_1, player_2, width, height)
+
+            while True:
+                # Assert
+                self.assertEqual(board.get_blank_spaces(),
+                                 bitboard.get_blank_spaces())
+                self.assertEqual(board.to_string(), bitboard.to_string())
+                for player in (player_1, player_2):
+                    self.assertEqual(
+                        sorted(board.get_legal_moves(player)),
+                        sorted(bitboard.get_legal_moves(player)))
+                    self.assertEqual(board.get_player_location(player),
+                                     bitboard.get_player_location(player))
+                    self.assertEqual(board.utility(player),
+                                     bitboard.utility(player))
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+
+                # Act
+                move = moves[0]
+                bitboard = bitboard.forecast_move(move)
+                board.apply_move(move)
+
+            self.assertEqual(
+                isolation.BitBoard.from_board(board).to_string(),
+                bitboard.to_string())
+
+    def test_copy_is_independent(self):
+        # Arrange
+        game = isolation.BitBoard("p1", "p2")
+        game.apply_move((2, 3))
+
+        # Act
+        new_game = game.copy()
+        new_game.apply_move((0, 5))
+
+        # Assert
+        self.assertEqual(None, game.get_player_location("p2"))
+        self.assertEqual((0, 5), new_game.get_player_location("p2"))
+        self.assertEqual("p2", game.active_player)
+
+
+class PushPopMoveTest(unittest.TestCase):
+    """Unit tests for in-place move application and search"""
+
+    def test_pop_move_restores_state(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            # Arrange
+            game = board_cls("p1", "p2", width=5, height=5)
+            game.apply_move((0, 0))
+            states = []
+
+            # Act
+            while game.get_legal_moves():
+                states.append((game.to_string(), game.active_player,
+                               game.move_count, game.get_legal_moves("p1"),
+                               game.get_legal_moves("p2")))
+                game.push_move(game.get_legal_moves()[0])
+
+            # Assert
+            while states:
+                game.pop_move()
+                string, active, move_count, p1_moves, p2_moves = states.pop()
+                self.assertEqual(string, game.to_string())
+                self.assertEqual(active, game.active_player)
+                self.assertEqual(move_count, game.move_count)
+                self.assertEqual(sorted(p1_moves),
+                                 sorted(game.get_legal_moves("p1")))
+                self.assertEqual(sorted(p2_moves),
+                                 sorted(game.get_legal_moves("p2")))
+
+    def test_inplace_search_restores_board_on_timeout(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            # Arrange
+            player_1 = game_agent.AlphaBetaPlayer(inplace=True)
+            player_2 = sample_players.GreedyPlayer()
+            game = board_cls(player_1, player_2)
+            game.apply_move((3, 3))
+            game.apply_move((0, 5))
+            before = game.to_string()
+            calls = iter(range(500, -1, -1))
+
+            # Act
+            best_move = player_1.get_move(game, lambda: next(calls))
+
+            # Assert
+            self.assertIn(best_move, game.get_legal_moves())
+            self.assertEqual(before, game.to_string())
+            self.assertEqual(player_1, game.active_player)
+
+
+class ZobristHashTest(unittest.TestCase):
+    """Unit tests for incremental Zobrist hashing"""
+
+    def test_incremental_hash_matches_full_hash(self):
+        # Arrange
+        board = isolation.Board("p1", "p2", width=6, height=5)
+        bitboard = isolation.BitBoard("p1", "p2", width=6, height=5)
+        hashes = []
+
+        # Act
+        while board.get_legal_moves():
+            hashes.append(board.hash())
+            move = board.get_legal_moves()[0]
+            board.push_move(move)
+            bitboard.push_move(move)
+
+            # Assert
+            self.assertEqual(board._compute_hash(), board.hash())
+            self.assertEqual(board.hash(), bitboard.hash())
+            self.assertEqual(board.hash(), board.copy().hash())
+            self.assertNotIn(board.hash(), hashes)
+
+        while hashes:
+            board.pop_move()
+            bitboard.pop_move()
+            self.assertEqual(hashes.pop(), board.hash())
+            self.assertEqual(board.hash(), bitboard.hash())
+
+    def test_hash_includes_player_to_move(self):
+        # Arrange
+        game = isolation.Board("p1", "p2")
+        game.apply_move((0, 0))
+        game.apply_move((6, 6))
+        other_game = isolation.Board("p1", "p2")
+        other_game.apply_move((0, 0))
+        other_game.apply_move((6, 6))
+
+        # Act
+        game.apply_move((1, 2))
+        game.apply_move((4, 5))
+        other_game.apply_move((1, 2))
+
+        # Assert
+        self.assertNotEqual(game.hash(), other_game.hash())
+        self.assertEqual(game.hash(), game._compute_hash())
+        self.assertEqual(other_game.hash(), other_game._compute_hash())
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """Unit tests for the transposition table"""
+
+    def test_search_value_is_unchanged(self):
+        for policy in game_agent.TranspositionTable.POLICIES:
+            # Arrange
+            table = game_agent.TranspositionTable(max_entries=64,
+                                                  policy=policy)
+            player_1 = game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score,
+                transposition_table=table)
+            reference_player = game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score)
+            player_2 = sample_players.GreedyPlayer()
+            games = []
+            for player in (player_1, reference_player):
+                player.time_left = fake_time_left
+                game = isolation.Board(player, player_2, width=5, height=5)
+                game.apply_move((2, 2))
+                game.apply_move((0, 0))
+                games.append(game)
+
+            # Act
+            player_1.alphabeta(games[0], 4)
+            reference_player.alphabeta(games[1], 4)
+
+            # Assert
+            self.assertEqual(reference_player._best_score,
+                             player_1._best_score)
+            self.assertGreater(table.stores, 0)
+            self.assertLessEqual(len(table), 64)
+
+    def test_depth_preferred_replacement(self):
+        # Arrange
+        table = game_agent.TranspositionTable(max_entries=1)
+        table.store(1, 5, 1., table.EXACT, (0, 0))
+
+        # Act
+        table.store(2, 3, 2., table.EXACT, (1, 1))
+
+        # Assert
+        self.assertEqual(1, table.rejections)
+        self.assertIsNone(table.probe(2))
+        self.assertEqual(1, table.stats()["collisions"])
+        self.assertEqual(5, table.probe(1)[1])
+
+        # Act
+        table.new_search()
+        table.store(2, 3, 2., table.EXACT, (1, 1))
+
+        # Assert
+        self.assertIsNone(table.probe(1))
+        self.assertEqual((1, 1), table.probe(2)[4])
+
+    def test_memory_cap(self):
+        table = game_agent.TranspositionTable(
+            max_bytes=100 * game_agent.TranspositionTable.ENTRY_BYTES,
+            policy="two_tier")
+        self.assertEqual(100, table.stats()["slots"])
+
+
+class PrincipalVariationTest(unittest.TestCase):
+    """Unit tests for move ordering across iterative deepening passes"""
+
+    def test_previous_pass_orders_next_pass(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score)
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2, width=6, height=6)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        player_1.time_left = fake_time_left
+
+        # Act
+        best_move = player_1.alphabeta(game, 3)
+        pv = player_1._pv
+        root_scores = dict(player_1._root_scores)
+        moves = game.get_legal_moves()
+        player_1._order_moves(moves, 0, True, None, root_scores)
+
+        # Assert
+        self.assertEqual(3, len(pv))
+        self.assertEqual(best_move, pv[0])
+        self.assertEqual(best_move, moves[0])
+        self.assertEqual(
+            sorted(root_scores.values(), reverse=True),
+            [root_scores[m] for m in moves if m in root_scores])
+
+
+class MoveOrdererTest(unittest.TestCase):
+    """Unit tests for killer-move and history move ordering"""
+
+    def test_killers_then_history(self):
+        # Arrange
+        orderer = game_agent.MoveOrderer()
+        orderer.cutoff((1, 2), 3, 0, 2)
+        orderer.cutoff((2, 1), 1, 0, 4)
+        orderer.cutoff((0, 3), 1, 1, 5)
+        moves = [(3, 4), (1, 2), (2, 1), (0, 3)]
+
+        # Act
+        orderer.order(moves, 3, 0)
+
+        # Assert
+        self.assertEqual([(1, 2), (2, 1), (3, 4), (0, 3)], moves)
+
+    def test_search_records_cutoffs(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score,
+            move_ordering="killer_history")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        calls = iter(range(2000, -1, -1))
+
+        # Act
+        player_1.get_move(game, lambda: next(calls))
+
+        # Assert
+        self.assertTrue(player_1.orderer.killers)
+        self.assertTrue(player_1.orderer.history[0])
+        self.assertTrue(player_1.depth_nodes)
+        self.assertEqual(list(range(1, len(player_1.depth_nodes) + 1)),
+                         [depth for depth, _ in player_1.depth_nodes])
+
+
+class ParallelSearchTest(unittest.TestCase):
+    """Unit tests for root-splitting parallel search"""
+
+    def test_parallel_search_returns_legal_move(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, processes=2)
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        player_1.start()
+        self.addCleanup(player_1.close)
+        time_left = isolation.isolation.TIME_LIMIT_MILLIS
+
+        # Act
+        start = timeit.default_timer()
+        best_move = player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start))
+
+        # Assert
+        self.assertIn(best_move, game.get_legal_moves())
+        self.assertTrue(player_1.depth_nodes)
+        self.assertLess(1000 * (timeit.default_timer() - start), time_left)
+
+    def test_parallel_search_with_node_budget(self):
+        # Arrange: a node limited budget has no deadline
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, processes=2,
+            parallel="root")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        player_1.start()
+        self.addCleanup(player_1.close)
+        budget = isolation.SearchBudget(node_limit=2000)
+
+        # Act
+        best_move = player_1.get_move(game, budget.start())
+
+        # Assert: the nodes of the workers are charged to the budget
+        self.assertIn(best_move, game.get_legal_moves())
+        self.assertTrue(player_1.depth_nodes)
+        self.assertGreater(budget.nodes, 2000)
+        self.assertGreaterEqual(
+            budget.nodes, sum(nodes for _, nodes in player_1.depth_nodes))
+
+    def test_parallel_search_with_node_budget_and_time_manager(self):
+        # Arrange: the time manager wraps the budget for the move
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, processes=2,
+            parallel="root",
+            time_manager=game_agent.TimeManager(move_fraction=0.5))
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        player_1.start()
+        self.addCleanup(player_1.close)
+        budget = isolation.SearchBudget(node_limit=2000)
+
+        # Act
+        best_move = player_1.get_move(game, budget.start())
+
+        # Assert: the nodes of the workers are still charged to the budget
+        self.assertIn(best_move, game.get_legal_moves())
+        self.assertGreater(budget.nodes, 2000)
+
+    def test_worker_tables_are_aged_every_move(self):
+        # Arrange: run the worker function in this process
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score,
+            transposition_table=game_agent.TranspositionTable(),
+            move_ordering="killer_history")
+        game_agent._init_search_worker(
+            player, multiprocessing.Value("d", float("-inf")),
+            multiprocessing.Value("l", 0, lock=False))
+        self.addCleanup(game_agent._SEARCH_WORKER.clear)
+        board = isolation.Board(game_agent._SELF, game_agent._OPPONENT)
+        board.apply_move((3, 3))
+        board.apply_move((0, 5))
+        deadline = timeit.default_timer() + 10.
+
+        # Act
+        generations = []
+        for search_id, depth in enumerate((1, 2), 1):
+            for move in board.get_legal_moves():
+                game_agent._search_root_move(
+                    (board, move, depth, deadline, search_id))
+            generations.append(player.tt.generation)
+        player.orderer.killers = [[(1, 1)]]
+        board.apply_move(board.get_legal_moves()[0])
+        board.apply_move(board.get_legal_moves()[0])
+        move = board.get_legal_moves()[0]
+        game_agent._search_root_move((board, move, 1, deadline, 3))
+
+        # Assert: one new search per root position, not per pass
+        self.assertEqual(generations, [1, 1])
+        self.assertEqual(player.tt.generation, 2)
+        self.assertNotIn([(1, 1)], player.orderer.killers)
+
+
+class LazySMPTest(unittest.TestCase):
+    """Unit tests for the shared transposition table and Lazy SMP search"""
+
+    def test_shared_table_is_shared_across_pickling(self):
+        # Arrange
+        table = game_agent.SharedTranspositionTable(max_entries=64)
+        self.addCleanup(table.close)
+        copy = pickle.loads(pickle.dumps(table))
+
+        # Act
+        table.store(12345, 3, -2.5, table.LOWER, (1, 2))
+
+        # Assert
+        self.assertEqual(copy.probe(12345)[1:5], (3, -2.5, table.LOWER, (1, 2)))
+        self.assertIsNone(copy.probe(54321))
+
+    def test_lazy_smp_returns_legal_move(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, processes=2,
+            parallel="lazy_smp")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        player_1.start()
+        self.addCleanup(player_1.close)
+        time_left = isolation.isolation.TIME_LIMIT_MILLIS
+
+        # Act
+        start = timeit.default_timer()
+        best_move = player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start))
+
+        # Assert
+        self.assertIsInstance(player_1.tt, game_agent.SharedTranspositionTable)
+        self.assertIn(best_move, game.get_legal_moves())
+        self.assertLess(1000 * (timeit.default_timer() - start), time_left)
+
+
+class PonderTest(unittest.TestCase):
+    """Unit tests for pondering on the opponent's time"""
+
+    def test_ponder_warms_table_for_the_reply(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, ponder="all")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        player_1.start()
+        self.addCleanup(player_1.close)
+        time_left = isolation.isolation.TIME_LIMIT_MILLIS
+
+        # Act
+        start = timeit.default_timer()
+        game.apply_move(player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start)))
+        game.apply_move(game.get_legal_moves()[0])
+        time.sleep(0.2)
+        entry = player_1.tt.probe(game.hash())
+        start = timeit.default_timer()
+        best_move = player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start))
+
+        # Assert
+        self.assertIsNotNone(entry)
+        self.assertEqual((player_1.ponder_hits, player_1.ponder_misses), (1, 0))
+        self.assertIn(best_move, game.get_legal_moves())
+
+    def test_close_cancels_pondering_and_player_is_reusable(self):
+        # Arrange
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, ponder="all")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        self.addCleanup(player_1.close)
+        time_left = isolation.isolation.TIME_LIMIT_MILLIS
+
+        # Act
+        start = timeit.default_timer()
+        player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start))
+        pondered = player_1._pondered
+        player_1.close()
+        closed = (player_1._ponder_pool, player_1._finalizer, player_1._pondered)
+        start = timeit.default_timer()
+        best_move = player_1.get_move(
+            game, lambda: time_left - 1000 * (timeit.default_timer() - start))
+
+        # Assert
+        self.assertTrue(pondered)
+        self.assertEqual(closed, (None, None, ()))
+        self.assertIn(best_move, game.get_legal_moves())
+        self.assertIsInstance(player_1.tt, game_agent.SharedTranspositionTable)
+
+    def test_workers_are_released_when_player_is_collected(self):
+        # Arrange
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, ponder="all",
+            processes=2)
+        player.start()
+        finalizer = player._finalizer
+        self.addCleanup(finalizer)
+
+        # Act
+        del player
+        gc.collect()
+
+        # Assert
+        self.assertFalse(finalizer.alive)
+
+    def test_no_pondering_once_the_game_is_lost(self):
+        # Arrange: player 1 is cornered and has no legal move
+        player_1 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, ponder="all")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+        for move in ((1, 2), (2, 1), (0, 0), (4, 2)):
+            game.apply_move(move)
+        self.addCleanup(player_1.close)
+
+        # Act
+        best_move = player_1.get_move(game, lambda: 1000.)
+
+        # Assert
+        self.assertEqual(best_move, (-1, -1))
+        self.assertEqual(player_1._pondered, ())
+        self.assertIsNone(player_1._ponder_pool)
+
+
+class SearchBudgetTest(unittest.TestCase):
+    """Unit tests for node and time search budgets"""
+
+    def test_node_budget_is_reproducible(self):
+        # Arrange
+        results = []
+        for _ in range(2):
+            random.seed(1)
+            player_1 = game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score)
+            player_2 = sample_players.GreedyPlayer()
+            game = isolation.Board(player_1, player_2)
+            game.apply_move((3, 3))
+            game.apply_move((0, 5))
+            budget = isolation.SearchBudget(node_limit=500)
+
+            # Act
+            best_move = player_1.get_move(game, budget.start())
+            results.append((best_move, player_1.depth_nodes, budget.nodes))
+
+        # Assert
+        self.assertEqual(results[0], results[1])
+        self.assertIn(results[0][0], game.get_legal_moves())
+        self.assertEqual(results[0][2], 501)
+
+    def test_play_with_node_limit(self):
+        # Arrange
+        player_1 = game_agent.MinimaxPlayer(
+            score_fn=sample_players.improved_score, search_depth=10)
+        player_2 = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score)
+        game = isolation.Board(player_1, player_2)
+
+        # Act
+        winner, history, termination = game.play(time_limit=None,
+                                                 node_limit=200)
+
+        # Assert
+        self.assertIn(winner, (player_1, player_2))
+        self.assertNotEqual(termination, "timeout")
+
+    def test_minimax_does_not_forfeit_on_node_limit(self):
+        # Arrange
+        random.seed(4)
+        player_1 = game_agent.MinimaxPlayer(
+            score_fn=sample_players.improved_score)
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+
+        # Act
+        winner, history, termination = game.play(time_limit=None,
+                                                 node_limit=50)
+
+        # Assert: the search never finishes but still returns legal moves
+        self.assertEqual(termination, "illegal move")
+        self.assertGreater(len(history), 10)
+
+    def test_cpu_clock_ignores_waiting(self):
+        # Arrange
+        wall = isolation.SearchBudget(time_limit=1000.)
+        cpu = isolation.SearchBudget(time_limit=1000., clock="process")
+
+        # Act
+        wall.start()
+        cpu.start()
+        time.sleep(0.05)
+
+        # Assert
+        self.assertGreaterEqual(wall.elapsed(), 50.)
+        self.assertLess(cpu.elapsed(), 25.)
+        with self.assertRaises(ValueError):
+            isolation.SearchBudget(clock="sundial")
+
+    def test_play_records_move_timings(self):
+        # Arrange
+        player_1 = sample_players.GreedyPlayer()
+        player_2 = sample_players.RandomPlayer()
+        game = isolation.Board(player_1, player_2)
+
+        # Act
+        winner, history, termination = game.play(clock="thread")
+
+        # Assert
+        self.assertEqual(len(game.move_timings), len(history) + 1)
+        for clock_ms, wall_ms in game.move_timings:
+            self.assertGreaterEqual(clock_ms, 0.)
+            self.assertGreaterEqual(wall_ms, 0.)
+
+
+class FeaturesTest(unittest.TestCase):
+    """Unit tests for the fused feature extraction of Board and BitBoard"""
+
+    def test_features_match_board_queries(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            # Arrange
+            random.seed(3)
+            game = board_cls("player 1", "player 2")
+            while True:
+                for player in ("player 1", "player 2"):
+                    opponent = game.get_opponent(player)
+                    own_moves = set(game.get_legal_moves(player))
+                    opp_moves = set(game.get_legal_moves(opponent))
+
+                    # Act
+                    features = game.features(player)
+
+                    # Assert
+                    self.assertEqual(features.own_moves, own_moves)
+                    self.assertEqual(features.opp_moves, opp_moves)
+                    self.assertEqual(features.own_mobility, len(own_moves))
+                    self.assertEqual(features.opp_mobility, len(opp_moves))
+                    self.assertEqual(features.overlap,
+                                     len(own_moves & opp_moves))
+                    self.assertEqual(features.is_winner,
+                                     game.is_winner(player))
+                    self.assertEqual(features.is_loser, game.is_loser(player))
+                    self.assertEqual(features.is_active,
+                                     game.active_player == player)
+                    self.assertEqual(features.own_location,
+                                     game.get_player_location(player))
+                    self.assertEqual(features.opp_location,
+                                     game.get_player_location(opponent))
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+
+
+class CompileHeuristicTest(unittest.TestCase):
+    """Unit tests for the weighted heuristic compiler"""
+
+    def test_compiled_heuristics_match_custom_scores(self):
+        # Arrange
+        pairs = [
+            (game_agent.custom_score, game_agent.compile_heuristic(
+                game_agent.CUSTOM_SCORE_WEIGHTS)),
+            (game_agent.custom_score_2, game_agent.compile_heuristic(
+                game_agent.CUSTOM_SCORE_2_WEIGHTS)),
+            (game_agent.custom_score_3, game_agent.compile_heuristic(
+                game_agent.CUSTOM_SCORE_3_WEIGHTS)),
+            (sample_players.improved_score, game_agent.compile_heuristic(
+                {"mobility_difference": 1}))]
+        random.seed(5)
+        game = isolation.Board("player 1", "player 2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+
+        while True:
+            for reference, compiled in pairs:
+                for player in ("player 1", "player 2"):
+                    # Act
+                    score = compiled(game, player)
+
+                    # Assert
+                    self.assertEqual(repr(score),
+                                     repr(reference(game, player)))
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(random.choice(moves))
+
+    def test_zero_weights_are_skipped(self):
+        # Act
+        heuristic = game_agent.compile_heuristic(
+            [("own_mobility", 1), ("relative_center_domination", 0)])
+
+        # Assert
+        self.assertNotIn("center", heuristic.source)
+        with self.assertRaises(ValueError):
+            game_agent.compile_heuristic({"_center": 1})
+
+    def test_compiled_heuristic_pickles(self):
+        # Arrange
+        heuristic = game_agent.compile_heuristic(
+            game_agent.CUSTOM_SCORE_2_WEIGHTS)
+        game = isolation.Board("player 1", "player 2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+
+        # Act
+        loaded = pickle.loads(pickle.dumps(heuristic))
+
+        # Assert
+        self.assertEqual(loaded.weights, heuristic.weights)
+        self.assertEqual(loaded.source, heuristic.source)
+        self.assertEqual(loaded(game, "player 1"), heuristic(game, "player 1"))
+
+    def test_compiled_heuristic_plays_in_pool(self):
+        # Arrange
+        test_agent = tournament.Agent(game_agent.AlphaBetaPlayer(
+            score_fn=game_agent.compile_heuristic(
+                game_agent.CUSTOM_SCORE_WEIGHTS)), "AB_Compiled")
+        cpu_agent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        pool = multiprocessing.Pool(2)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.terminate)
+
+        # Act
+        sprt = tournament.play_sprt_match(
+            test_agent, cpu_agent, max_games=2, node_limit=200, pool=pool,
+            verbose=False)
+
+        # Assert
+        self.assertEqual(sprt.games, 2)
+
+
+class EvalCacheTest(unittest.TestCase):
+    """Unit tests for the LRU evaluation cache"""
+
+    def setUp(self):
+        self.game = isolation.Board("player 1", "player 2")
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+
+    def test_cache_returns_cached_scores(self):
+        # Arrange
+        calls = []
+        cache = game_agent.EvalCache(
+            lambda game, player: calls.append(player) or 1.)
+
+        # Act
+        scores = [cache(self.game, "player 1"), cache(self.game, "player 1"),
+                  cache(self.game, "player 2")]
+
+        # Assert
+        self.assertEqual(scores, [1., 1., 1.])
+        self.assertEqual(calls, ["player 1", "player 2"])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        # Arrange
+        cache = game_agent.EvalCache(sample_players.improved_score,
+                                     max_entries=2)
+        other = self.game.forecast_move((4, 4))
+
+        # Act
+        cache(self.game, "player 1")
+        cache(other, "player 1")
+        cache(self.game, "player 1")
+        cache(other, "player 2")
+
+        # Assert
+        self.assertEqual(cache.evictions, 1)
+        cache(self.game, "player 1")
+        self.assertEqual(cache.hits, 2)
+
+    def test_scope(self):
+        for scope, entries in (("move", 0), ("game", 1)):
+            # Arrange
+            cache = game_agent.EvalCache(sample_players.improved_score,
+                                         scope=scope)
+            cache.new_search(self.game)
+            cache(self.game, "player 1")
+
+            # Act
+            cache.new_search(self.game.forecast_move((4, 4)))
+
+            # Assert
+            self.assertEqual(len(cache), entries)
+
+
+@unittest.skipIf(game_agent.numpy is None, "NumPy is not installed")
+class BatchFrontierTest(unittest.TestCase):
+    """Unit tests for batched leaf evaluation at the search frontier"""
+
+    def test_batch_matches_scalar_heuristic(self):
+        # Arrange
+        heuristic = game_agent.compile_heuristic(
+            game_agent.CUSTOM_SCORE_2_WEIGHTS)
+        random.seed(7)
+        game = isolation.Board("player 1", "player 2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+
+        while game.get_legal_moves():
+            moves = game.get_legal_moves()
+            for player in ("player 1", "player 2"):
+                # Act
+                scores = heuristic.batch(game, moves, player)
+
+                # Assert
+                self.assertEqual(scores, [heuristic(game.forecast_move(m),
+                                                    player) for m in moves])
+            game.apply_move(random.choice(moves))
+
+    def test_batched_search_finds_same_score(self):
+        # Arrange
+        heuristic = game_agent.compile_heuristic(
+            game_agent.CUSTOM_SCORE_WEIGHTS)
+        scores = []
+        for batch_frontier in (False, True):
+            player_1 = game_agent.AlphaBetaPlayer(
+                score_fn=heuristic, batch_frontier=batch_frontier)
+            player_1.time_left = lambda: float("inf")
+            game = isolation.Board(player_1, "player 2")
+
+            # Act
+            player_1.alphabeta(game, 2)
+            scores.append(player_1._best_score)
+
+        # Assert
+        self.assertEqual(scores[0], scores[1])
+
+
+@unittest.skipIf(game_agent.numpy is None, "NumPy is not installed")
+class BoardBatchTest(unittest.TestCase):
+    """Unit tests for the vectorized board batch"""
+
+    def setUp(self):
+        random.seed(11)
+        self.boards = []
+        for plies in range(0, 40, 3):
+            game = isolation.Board("player 1", "player 2")
+            for _ in range(plies):
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+            self.boards.append(game)
+
+    def test_batch_matches_boards(self):
+        # Arrange
+        batch = isolation.BoardBatch.from_boards(self.boards)
+
+        # Act
+        legal = batch.legal_moves_mask()
+        terminal = batch.is_terminal()
+        moves = batch.random_moves(game_agent.numpy.random.default_rng(0))
+        batch.apply_moves(moves)
+
+        # Assert
+        for i, game in enumerate(self.boards):
+            self.assertEqual(
+                {(idx % 7, idx // 7) for idx in legal[i].nonzero()[0]},
+                set(game.get_legal_moves()))
+            self.assertEqual(terminal[i], not game.get_legal_moves())
+            if moves[i] >= 0:
+                game.apply_move((moves[i] % 7, moves[i] // 7))
+            for board_cls in (isolation.Board, isolation.BitBoard):
+                board = batch.to_board(i, "player 1", "player 2", board_cls)
+                self.assertEqual(board.hash(), game.hash())
+                self.assertEqual(board.to_string(), game.to_string())
+
+    def test_playout_ends_every_game(self):
+        for policy in ("random", "greedy"):
+            # Arrange
+            batch = isolation.BoardBatch.from_boards(self.boards)
+
+            # Act
+            winners = batch.playout(policy)
+
+            # Assert
+            self.assertTrue(batch.is_terminal().all())
+            self.assertTrue(((winners == 0) | (winners == 1)).all())
+
+
+class PlayoutEngineTest(unittest.TestCase):
+    """Unit tests for the Monte Carlo playout engine"""
+
+    def test_playouts_are_reproducible(self):
+        for policy in isolation.playout.POLICIES:
+            # Arrange
+            game = isolation.Board("player 1", "player 2")
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+
+            # Act
+            stats = [isolation.playout.PlayoutEngine(policy, seed=3).run(
+                game, 200) for _ in range(2)]
+
+            # Assert
+            self.assertEqual(stats[0].wins, stats[1].wins)
+            self.assertEqual(sum(stats[0].wins), 200)
+            self.assertGreater(stats[0].playouts_per_second, 0)
+
+    def test_finished_game_is_won_by_inactive_player(self):
+        # Arrange
+        game = isolation.Board("player 1", "player 2", width=3, height=3)
+        game.apply_move((1, 1))
+        game.apply_move((0, 0))
+        engine = isolation.playout.PlayoutEngine(processes=2)
+        self.addCleanup(engine.close)
+
+        # Act
+        stats = engine.run(game, 10)
+
+        # Assert
+        self.assertEqual(stats.wins, (0, 10))
+
+
+class MCTSPlayerTest(unittest.TestCase):
+    """Unit tests for the Monte Carlo tree search player"""
+
+    def test_takes_only_winning_move(self):
+        # Arrange: player 1 at (0, 0) can reach (1, 2) and (2, 1); moving to
+        # (1, 2) leaves player 2 at (2, 0) without moves, while moving to
+        # (2, 1) loses after the reply (1, 2)
+        player = game_agent.MCTSPlayer(seed=0)
+        game = isolation.Board(player, "opponent", width=3, height=3)
+        for move in [(0, 2), (0, 1), (0, 0), (2, 0)]:
+            game.apply_move(move)
+        budget = isolation.SearchBudget(node_limit=500)
+
+        # Act
+        move = player.get_move(game, budget.start())
+
+        # Assert
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(move, (1, 2))
+        self.assertEqual(player.iterations, 500)
+
+    def test_tree_is_reused_after_opponent_reply(self):
+        # Arrange
+        player = game_agent.MCTSPlayer(seed=1)
+        game = isolation.Board(player, "opponent")
+        budget = isolation.SearchBudget(node_limit=2000)
+
+        # Act
+        move = player.get_move(game, budget.start())
+        game.apply_move(move)
+        kept_nodes, kept_bytes = player.tree_memory()
+        game.apply_move(game.get_legal_moves()[0])
+        player.get_move(game, budget.start())
+
+        # Assert
+        self.assertGreater(kept_nodes, 1)
+        self.assertGreater(kept_bytes, 0)
+        self.assertGreater(player.reused_visits, 0)
+        self.assertGreater(player.iterations_per_second, 0)
+
+    def test_tree_is_discarded_for_unrelated_position(self):
+        # Arrange
+        player = game_agent.MCTSPlayer(seed=2)
+        budget = isolation.SearchBudget(node_limit=300)
+        player.get_move(isolation.Board(player, "opponent"), budget.start())
+        game = isolation.Board("opponent", player)
+        game.apply_move((3, 3))
+
+        # Act
+        move = player.get_move(game, budget.start())
+
+        # Assert
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(player.reused_visits, 0)
+
+    def test_competition_agent_uses_mcts_engine(self):
+        # Arrange
+        player = competition_agent.CustomPlayer(data="mcts")
+        game = isolation.Board(player, "opponent", width=5, height=5)
+        budget = isolation.SearchBudget(node_limit=200)
+
+        # Act
+        move = player.get_move(game, budget.start())
+
+        # Assert
+        self.assertIsInstance(player.engine, game_agent.MCTSPlayer)
+        self.assertIn(move, game.get_legal_moves())
+
+    def test_full_game_at_default_time_limit_without_timeout(self):
+        # Arrange
+        player_1 = competition_agent.CustomPlayer(data="mcts")
+        player_2 = sample_players.GreedyPlayer()
+        game = isolation.Board(player_1, player_2)
+
+        # Act
+        winner, history, termination = game.play()
+
+        # Assert
+        self.assertNotEqual(termination, "timeout")
+        for clock_ms, _ in game.move_timings[::2]:
+            self.assertLess(clock_ms, isolation.isolation.TIME_LIMIT_MILLIS)
+
+
+class EndgameTest(unittest.TestCase):
+    """Unit tests for the endgame solver of partitioned games"""
+
+    def setUp(self):
+        # player 2 in the corner (0, 4) of a 5x5 board is walled in by the
+        # blocked cells (1, 2) and (2, 3); player 1 at (2, 1) to move can
+        # visit 19 more cells unless it steps into the corner (0, 0)
+        self.player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score)
+        self.game = isolation.Board(self.player, "opponent", 5, 5)
+        for move in [(1, 2), (2, 3), (2, 1), (0, 4)]:
+            self.game.apply_move(move)
+
+    def test_partition(self):
+        # Act
+        part = isolation.endgame.partition(self.game)
+        shared = isolation.Board("player 1", "player 2", 5, 5)
+        shared.apply_move((0, 0))
+        shared.apply_move((4, 4))
+
+        # Assert
+        self.assertEqual(part.own_location, 2 + 1 * 5)
+        self.assertEqual(part.opp_region, 0)
+        self.assertEqual(bin(part.own_region).count("1"), 21)
+        self.assertIsNone(isolation.endgame.partition(shared))
+
+    def test_longest_path_on_open_board(self):
+        # Arrange: the 5x5 board has open knight's tours from the corners,
+        # while paths from (1, 0) alternate with the 12 cells of its colour
+        masks, _ = isolation.bitboard.board_geometry(5, 5)
+        full = (1 << 25) - 1
+
+        # Act
+        corner = isolation.endgame.longest_path(masks, full & ~1, 0)
+        edge = isolation.endgame.longest_path(masks, full & ~2, 1)
+
+        # Assert
+        self.assertEqual(corner, 24)
+        self.assertEqual(edge, 23)
+
+    def test_alphabeta_switches_to_solver(self):
+        # Arrange
+        budget = isolation.SearchBudget(node_limit=100000)
+
+        # Act
+        move = self.player.get_move(self.game, budget.start())
+
+        # Assert
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertNotEqual(move, (0, 0))
+        self.assertEqual(self.player.endgame_lengths, (19, 0))
+
+    def test_solver_cache_is_kept_per_board_size(self):
+        # Arrange: the same walled-in corner on a board with one more row
+        taller = isolation.Board(self.player, "opponent", 5, 6)
+        fresh = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score)
+        for move in [(1, 2), (2, 3), (2, 1), (0, 4)]:
+            taller.apply_move(move)
+        budget = isolation.SearchBudget(node_limit=100000)
+
+        # Act
+        self.player.get_move(self.game, budget.start())
+        self.player.get_move(taller, budget.start())
+        fresh.get_move(taller.with_players(
+            {self.player: fresh, "opponent": "opponent"}), budget.start())
+
+        # Assert
+        self.assertEqual(self.player.endgame_lengths, fresh.endgame_lengths)
+        self.assertEqual(set(self.player._endgame_cache),
+                         set(fresh._endgame_cache))
+
+    def test_solver_returns_a_move_when_time_is_up(self):
+        # Arrange
+        budget = isolation.SearchBudget(node_limit=1)
+
+        # Act
+        move = self.player.get_move(self.game, budget.start())
+
+        # Assert
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertNotEqual(move, (0, 0))
+        self.assertEqual(self.player.endgame_lengths, (None, None))
+
+
+class ResolvedSearchTest(unittest.TestCase):
+    """Unit tests for stopping iterative deepening once the search is
+    resolved"""
+
+    def test_stops_when_every_line_reaches_the_end(self):
+        # Arrange
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, endgame=False)
+        game = isolation.Board(player, "opponent", width=4, height=4)
+        game.apply_move((0, 0))
+        game.apply_move((3, 3))
+
+        # Act: the clock never runs out
+        move = player.get_move(game, lambda: float("inf"))
+
+        # Assert
+        self.assertIn(move, game.get_legal_moves())
+        self.assertTrue(player.resolved)
+        self.assertLessEqual(player.depth_nodes[-1][0],
+                             len(game.get_blank_spaces()))
+
+    def test_stops_on_proven_win(self):
+        # Arrange: moving to (1, 2) leaves player 2 at (2, 0) without moves
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, endgame=False)
+        game = isolation.Board(player, "opponent", width=3, height=3)
+        for move in [(0, 2), (0, 1), (0, 0), (2, 0)]:
+            game.apply_move(move)
+
+        # Act
+        move = player.get_move(game, lambda: float("inf"))
+
+        # Assert
+        self.assertEqual(move, (1, 2))
+        self.assertEqual([depth for depth, _ in player.depth_nodes], [1])
+
+    def test_depth_limited_search_is_not_resolved(self):
+        # Arrange
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score)
+        player.time_left = lambda: float("inf")
+        game = isolation.Board(player, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((2, 3))
+
+        # Act
+        player.alphabeta(game, 2)
+
+        # Assert
+        self.assertFalse(player.resolved)
+
+
+class TimeManagerTest(unittest.TestCase):
+    """Unit tests for the predictive time manager of iterative deepening"""
+
+    def test_predicts_from_effective_branching_factor(self):
+        # Arrange
+        manager = game_agent.TimeManager(branching=3.)
+        manager.new_move(lambda: 1000.)
+        default = manager.effective_branching_factor()
+
+        # Act
+        for depth, nodes in [(1, 10), (2, 40), (3, 100)]:
+            manager.record(depth, nodes)
+
+        # Assert
+        self.assertEqual(default, 3.)
+        self.assertEqual(manager.effective_branching_factor(), 4.)
+        self.assertEqual([d for d, _, _ in manager.depth_times], [1, 2, 3])
+        self.assertAlmostEqual(manager.predict(),
+                               manager.depth_times[-1][2] * 4. * 1.2)
+        self.assertFalse(manager.can_finish(-1.))
+        self.assertEqual(manager.skipped_passes, 1)
+
+    def test_move_budget_below_time_limit(self):
+        # Arrange
+        manager = game_agent.TimeManager(move_millis=50., move_fraction=.5)
+
+        # Act
+        short_turn = manager.new_move(lambda: 60.)()
+        long_turn = manager.new_move(lambda: 1000.)()
+
+        # Assert
+        self.assertLessEqual(short_turn, 30.)
+        self.assertLessEqual(long_turn, 50.)
+        self.assertGreater(long_turn, 30.)
+
+    def test_alphabeta_stops_at_move_budget(self):
+        # Arrange
+        manager = game_agent.TimeManager(move_millis=40.)
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, time_manager=manager)
+        game = isolation.Board(player, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((2, 3))
+        time_limit = 1000.
+        start = time.time()
+
+        # Act
+        move = player.get_move(
+            game, lambda: time_limit - 1000 * (time.time() - start))
+
+        # Assert
+        self.assertIn(move, game.get_legal_moves())
+        self.assertLess(1000 * (time.time() - start), 200.)
+        self.assertEqual([d for d, _, _ in manager.depth_times],
+                         [d for d, _ in player.depth_nodes])
+
+
+class ParallelTournamentTest(unittest.TestCase):
+    """Unit tests for playing tournament rounds on a worker pool"""
+
+    def test_pool_produces_the_same_wins(self):
+        # Arrange: node limited games play the same in any process
+        cpu_agent = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+        test_agents = [
+            tournament.Agent(game_agent.MinimaxPlayer(
+                search_depth=2, score_fn=sample_players.improved_score),
+                "MM_Improved"),
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score, endgame=False),
+                "AB_Improved")]
+        pool = multiprocessing.Pool(2)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.terminate)
+
+        # Act
+        wins = []
+        for round_pool in (None, pool):
+            random.seed(11)
+            win_counts = {agent.player: 0
+                          for agent in [cpu_agent] + test_agents}
+            tournament.play_round(cpu_agent, test_agents, win_counts, 2,
+                                  node_limit=300, pool=round_pool)
+            wins.append(win_counts)
+
+        # Assert
+        self.assertEqual(wins[0], wins[1])
+        self.assertEqual(sum(wins[0].values()), 8)
+        self.assertGreaterEqual(tournament.tournament_processes(), 1)
+
+    def test_agents_with_workers_play_outside_the_pool(self):
+        # Arrange: pool workers are daemonic and cannot start processes
+        cpu_agent = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+        test_agents = [
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score, processes=2),
+                "AB_Parallel"),
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score, ponder="predicted"),
+                "AB_Ponder")]
+        win_counts = {agent.player: 0 for agent in [cpu_agent] + test_agents}
+        pool = multiprocessing.Pool(2)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.terminate)
+
+        # Act
+        tournament.play_round(cpu_agent, test_agents, win_counts, 1,
+                              node_limit=300, pool=pool)
+
+        # Assert
+        self.assertEqual(sum(win_counts.values()), 4)
+        for agent in test_agents:
+            self.assertIsNone(agent.player._pool)
+            self.assertIsNone(agent.player._ponder_pool)
+
+
+class SPRTTest(unittest.TestCase):
+    """Unit tests for sequential probability ratio test early stopping"""
+
+    def test_elo_score_round_trip(self):
+        for elo in (-300., 0., 50., 400.):
+            self.assertAlmostEqual(
+                ratings.score_to_elo(ratings.elo_to_score(elo)), elo)
+        self.assertEqual(ratings.elo_to_score(0.), .5)
+        self.assertEqual(ratings.score_to_elo(1.), float("inf"))
+
+    def test_accepts_h1_for_stronger_agent(self):
+        # Arrange
+        sprt = ratings.SPRT(elo0=0., elo1=50.)
+
+        # Act
+        status = None
+        while status is None:
+            status = sprt.update(sprt.games % 4 != 3)
+
+        # Assert
+        self.assertEqual(status, "H1")
+        self.assertGreaterEqual(sprt.llr, sprt.upper_bound)
+        low, elo, high = sprt.elo_interval()
+        self.assertLess(low, elo)
+        self.assertLess(elo, high)
+        self.assertGreater(low, 0.)
+
+    def test_accepts_h0_for_weaker_agent(self):
+        # Arrange
+        sprt = ratings.SPRT(elo0=0., elo1=50., alpha=.01, beta=.01)
+
+        # Act
+        for _ in range(100):
+            if sprt.update(False) is not None:
+                break
+
+        # Assert
+        self.assertEqual(sprt.status(), "H0")
+        self.assertLess(sprt.games, 100)
+        self.assertEqual(sprt.elo_interval()[1], float("-inf"))
+        self.assertLess(sprt.elo_interval()[2], 0.)
+
+    def test_play_sprt_match_stops_early(self):
+        # Arrange
+        random.seed(2)
+        test_agent = tournament.Agent(game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score), "AB_Improved")
+        cpu_agent = tournament.Agent(sample_players.RandomPlayer(), "Random")
+
+        # Act
+        sprt = tournament.play_sprt_match(
+            test_agent, cpu_agent, ratings.SPRT(elo0=0., elo1=200.),
+            max_games=40, node_limit=200, verbose=False)
+
+        # Assert
+        self.assertEqual(sprt.status(), "H1")
+        self.assertLess(sprt.games, 40)
+        self.assertEqual(sprt.games % 2, 0)
+
+
+class RatingPoolTest(unittest.TestCase):
+    """Unit tests for the incremental rating pool"""
+
+    def test_ratings_follow_results(self):
+        # Arrange
+        rng = random.Random(0)
+        strengths = {"strong": 1800., "medium": 1500., "weak": 1200.}
+        pool = ratings.RatingPool(strengths)
+
+        # Act
+        for _ in range(300):
+            a, b = pool.next_pairing(rng)
+            if rng.random() < ratings.elo_to_score(strengths[a] -
+                                                    strengths[b]):
+                pool.update(a, b)
+            else:
+                pool.update(b, a)
+
+        # Assert
+        order = [row[0] for row in pool.standings()]
+        self.assertEqual(order, ["strong", "medium", "weak"])
+        self.assertEqual(pool.games(), 300)
+        for agent in strengths:
+            low, high = pool.interval(agent)
+            self.assertLess(high - low, 2 * 1.96 * 350.)
+        fitted = pool.bradley_terry()
+        self.assertGreater(fitted["strong"], fitted["medium"])
+        self.assertGreater(fitted["medium"], fitted["weak"])
+
+    def test_pairs_uncertain_agents_first(self):
+        # Arrange
+        pool = ratings.RatingPool(["a", "b"])
+        for _ in range(30):
+            pool.update("a", "b")
+            pool.update("b", "a")
+
+        # Act
+        pool.add("newcomer")
+        pairing = pool.next_pairing()
+        restricted = pool.next_pairing(agents=["a", "b"])
+
+        # Assert
+        self.assertIn("newcomer", pairing)
+        self.assertEqual(set(restricted), {"a", "b"})
+
+    def test_play_rating_pool(self):
+        # Arrange
+        random.seed(3)
+        agents = [
+            tournament.Agent(sample_players.RandomPlayer(), "Random"),
+            tournament.Agent(sample_players.GreedyPlayer(), "Greedy"),
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score), "AB_Improved")]
+
+        # Act
+        pool = tournament.play_rating_pool(agents, 6, node_limit=100,
+                                           verbose=False)
+
+        # Assert
+        self.assertEqual(pool.games(), 12)
+        self.assertEqual(len(pool), 3)
+
+
+class GameRecordTest(unittest.TestCase):
+    """Unit tests for streaming the records of tournament games"""
+
+    def test_records_replay_games(self):
+        # Arrange: tournament.py holds the classes of game_agent from before
+        # any reload
+        cpu_agent = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+        test_agents = [
+            tournament.Agent(tournament.MinimaxPlayer(
+                search_depth=2, score_fn=sample_players.improved_score),
+                "MM_Improved"),
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score, endgame=False),
+                "AB_Improved")]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        # Act
+        games = {}
+        for name in ("games.jsonl", "games.bin"):
+            path = os.path.join(directory.name, name)
+            random.seed(5)
+            win_counts = {agent.player: 0
+                          for agent in [cpu_agent] + test_agents}
+            with records.GameRecordWriter(path) as writer:
+                tournament.play_round(cpu_agent, test_agents, win_counts, 1,
+                                      node_limit=200, records=writer)
+            games[name] = list(records.read_records(path))
+
+        # Assert
+        self.assertEqual(len(games["games.jsonl"]), 4)
+        for jsonl_record, bin_record in zip(games["games.jsonl"],
+                                            games["games.bin"]):
+            # the latencies differ from one run to the next
+            for record in (jsonl_record, bin_record):
+                latencies = record.pop("move_latency_ms")
+                self.assertEqual(len(latencies),
+                                 len(record["move_history"]) - 1)
+                self.assertGreaterEqual(min(latencies), 0.)
+            self.assertEqual(jsonl_record, bin_record)
+        wins = {name: 0 for name in ("Greedy", "MM_Improved", "AB_Improved")}
+        for record in games["games.jsonl"]:
+            moves = record["move_history"]
+            self.assertEqual(moves[:2], record["opening"])
+            self.assertEqual(len(record["search_depths"]), len(moves) - 1)
+            board = isolation.Board("player 1", "player 2")
+            for move in moves:
+                self.assertIn(tuple(move), board.get_legal_moves())
+                board.apply_move(tuple(move))
+            self.assertEqual(record["termination"], "illegal move")
+            self.assertFalse(board.get_legal_moves())
+            self.assertEqual(record["winner"], 2 - len(moves) % 2)
+            winner = record["player{}".format(record["winner"])]
+            wins[winner] += 1
+            if "MM_Improved" in (record["player1"], record["player2"]):
+                player = 1 if record["player1"] == "MM_Improved" else 2
+                self.assertEqual(set(record["search_depths"][
+                    player - 1::2]), {2})
+        self.assertEqual(wins, {agent.name: win_counts[agent.player]
+                                for agent in [cpu_agent] + test_agents})
+
+    def test_pool_streams_the_same_records(self):
+        # Arrange
+        cpu_agent = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+        test_agents = [tournament.Agent(game_agent.MinimaxPlayer(
+            search_depth=2, score_fn=sample_players.improved_score),
+            "MM_Improved")]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        pool = multiprocessing.Pool(2)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.terminate)
+
+        # Act
+        games = []
+        for name, round_pool in (("serial.jsonl", None), ("pool.jsonl", pool)):
+            path = os.path.join(directory.name, name)
+            random.seed(7)
+            win_counts = {agent.player: 0
+                          for agent in [cpu_agent] + test_agents}
+            with records.GameRecordWriter(path) as writer:
+                tournament.play_round(cpu_agent, test_agents, win_counts, 3,
+                                      node_limit=200, pool=round_pool,
+                                      records=writer)
+            games.append([record["move_history"]
+                          for record in records.read_records(path)])
+
+        # Assert: the games may finish in any order in the pool
+        self.assertEqual(len(games[0]), 6)
+        self.assertEqual(sorted(games[0]), sorted(games[1]))
+
+
+class PvPBoardTest(unittest.TestCase):
+    """Unit tests for playing on a board without the extensions of
+    isolation.Board, like the board of the PvP competition"""
+
+    def test_competition_agent_keeps_the_board_players(self):
+        # Arrange
+        player = competition_agent.CustomPlayer()
+        game = PlainBoard(player, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        budget = isolation.SearchBudget(node_limit=500)
+
+        # Act
+        move = player.get_move(game, budget.start())
+
+        # Assert
+        self.assertIn(move, game.get_legal_moves())
+        self.assertIs(game.active_player, player)
+
+    def test_custom_scores_without_board_features(self):
+        # Arrange
+        scores = [game_agent.custom_score, game_agent.custom_score_2,
+                  game_agent.custom_score_3, game_agent.compile_heuristic(
+                      game_agent.CUSTOM_SCORE_2_WEIGHTS)]
+        random.seed(6)
+        game = PlainBoard("player 1", "player 2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+
+        while True:
+            for score_fn in scores:
+                for player in ("player 1", "player 2"):
+                    # Act
+                    score = score_fn(game, player)
+
+                    # Assert: a copy is a board with features
+                    self.assertEqual(repr(score),
+                                     repr(score_fn(game.copy(), player)))
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(random.choice(moves))
+
+
 def fake_time_left():
     return 250  # msecs
 
@@ -284,5 +1797,17 @@ class ScorerFunctionException(Exception):
     pass
 
 
+class PlainBoard(isolation.Board):
+    """A board hiding the methods missing from the board of the PvP
+    competition; copies are plain `isolation.Board` instances."""
+
+    HIDDEN = ("features", "with_players")
+
+    def __getattribute__(self, name):
+        if name in PlainBoard.HIDDEN:
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
 if __name__ == '__main__':
     unittest.main()
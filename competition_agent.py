@@ -6,6 +6,8 @@ champions) in a tournament.
 """
 import random
 
+import game_agent
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -33,7 +35,7 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    raise NotImplementedError
+    return game_agent.custom_score(game, player)
 
 
 class CustomPlayer:
@@ -52,19 +54,50 @@ class CustomPlayer:
     Parameters
     ----------
     data : string
-        The name of the search method to use in get_move().
+        The name of the search method to use in get_move(): 'alphabeta' (the
+        default) searches with a `game_agent.AlphaBetaPlayer` using a
+        transposition table, killer/history move ordering and predictive
+        time management; 'mcts' searches with a `game_agent.MCTSPlayer`
+        keeping its tree between moves.
 
     timeout : float (optional)
         Time remaining (in milliseconds) when search is aborted.  Note that
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    ponder : str (optional)
+        Keep searching on the opponent's time; see the `ponder` parameter of
+        `game_agent.AlphaBetaPlayer`, e.g., 'predicted'. None (the default)
+        disables pondering. The background worker is released by close(), or
+        at the latest when the player is garbage collected or the
+        interpreter exits. Ignored by 'mcts'.
     """
 
-    def __init__(self, data=None, timeout=1.):
+    def __init__(self, data=None, timeout=1., ponder=None):
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        if data not in (None, "alphabeta", "mcts"):
+            raise ValueError("Unknown search method: {}".format(data))
+        if data == "mcts":
+            self.engine = game_agent.MCTSPlayer(timeout=timeout)
+        else:
+            self.engine = game_agent.AlphaBetaPlayer(
+                score_fn=custom_score, timeout=timeout,
+                transposition_table=game_agent.TranspositionTable(),
+                move_ordering="killer_history", ponder=ponder,
+                time_manager=game_agent.TimeManager())
+
+    def start(self):
+        """Start the background worker of the search engine, so that the
+        startup cost is not charged to the first move.
+        """
+        self.engine.start()
+
+    def close(self):
+        """Stop the background worker of the search engine."""
+        self.engine.close()
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -93,5 +126,8 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.time_left = time_left
+        opponent = game.get_opponent(self)
+        board = game_agent._with_players(
+            game, {self: self.engine, opponent: opponent})
+        return self.engine.get_move(board, time_left)
@@ -3,7 +3,22 @@ test your agent's strength against a set of known agents using tournament.py
 and include the results in your report.
 """
 
+import copy
+import math
+import multiprocessing
 import random
+import struct
+import sys
+import timeit
+import weakref
+
+from collections import OrderedDict
+
+try:
+    import numpy
+    from isolation.batch import knight_adjacency
+except ImportError:
+    numpy = None
 
 
 class SearchTimeout(Exception):
@@ -11,6 +26,289 @@ class SearchTimeout(Exception):
     pass
 
 
+def _make_move(game, move, inplace):
+    """Return the game state after the active player makes `move`.
+
+    With `inplace` the move is applied to `game` itself with
+    `Board.push_move`, and must be reverted with `_unmake_move`; otherwise a
+    copy is returned by `Board.forecast_move`.
+    """
+    if inplace:
+        game.push_move(move)
+        return game
+    return game.forecast_move(move)
+
+
+def _unmake_move(game, inplace):
+    """Revert the move applied by `_make_move` when searching in place."""
+    if inplace:
+        game.pop_move()
+
+
+def _with_players(game, players):
+    """Return a copy of `game` in which the registered players are replaced
+    as mapped by `players`; see `Board.with_players`.
+
+    Boards without `with_players` (e.g., the board of the PvP competition)
+    are copied and their players mapped on the copy, leaving the classes of
+    the game untouched.
+    """
+    if hasattr(game, "with_players"):
+        return game.with_players(players)
+    board = game.copy()
+    board._player_1 = players[game._player_1]
+    board._player_2 = players[game._player_2]
+    board._active_player = players[game._active_player]
+    board._inactive_player = players[game._inactive_player]
+    return board
+
+
+# Placeholders for the searching player and its opponent in the boards sent
+# to worker processes, see `_with_players`
+_SELF = "self"
+_OPPONENT = "opponent"
+
+# State of a parallel search worker process, set by `_init_search_worker`
+_SEARCH_WORKER = {}
+
+
+def _init_search_worker(player, shared_alpha, shared_search):
+    """Initialize a pool worker that searches on behalf of `player`."""
+    player.processes = 1
+    _SEARCH_WORKER.update(player=player, alpha=shared_alpha,
+                          search=shared_search)
+
+
+def _deadline(remaining):
+    """Return the `timeit.default_timer()` value `remaining` milliseconds
+    from now, or None if `remaining` is infinite (e.g., the time left of a
+    budget limited on nodes only).
+    """
+    if remaining == float("inf"):
+        return None
+    return timeit.default_timer() + remaining / 1000.
+
+
+def _millis_to(deadline):
+    """Return the milliseconds left before a `_deadline()`, infinite if
+    there is none.
+    """
+    if deadline is None:
+        return float("inf")
+    return 1000 * (deadline - timeit.default_timer())
+
+
+def _seconds_to(deadline):
+    """Return the timeout in seconds of a wait for a result due before a
+    `_deadline()`, None (no timeout) if there is none.
+    """
+    if deadline is None:
+        return None
+    return max(0., deadline - timeit.default_timer())
+
+
+def _release_workers(pools, table):
+    """Stop the worker `pools` of a player and release its shared
+    transposition `table` (or None); see `AlphaBetaPlayer.close`.
+    """
+    for pool in pools:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    if table is not None:
+        table.close()
+
+
+def _search_root_move(task):
+    """Search the subtree of one root move in a pool worker.
+
+    The worker starts from the best root score published so far by the
+    other workers for the same search, and publishes its own score if it
+    improves on it.
+
+    Parameters
+    ----------
+    task : tuple
+        (board, move, depth, deadline, search_id) where `board` is the root
+        position with the players replaced by `_SELF` and `_OPPONENT`, and
+        `deadline` is the `_deadline()` at which the search must stop. The
+        search also stops once the search `search_id` is no longer the
+        current one.
+
+    Returns
+    -------
+    tuple
+        (move, score, nodes, cutoff); score is None if the search timed out,
+        and cutoff is True if a line was cut off by the depth limit.
+    """
+    board, move, depth, deadline, search_id = task
+    player = _SEARCH_WORKER["player"]
+    shared_alpha = _SEARCH_WORKER["alpha"]
+    shared_search = _SEARCH_WORKER["search"]
+
+    def time_left():
+        if shared_search.value != search_id:
+            return float("-inf")
+        return _millis_to(deadline)
+
+    player.time_left = time_left
+    game = _with_players(board, {_SELF: player, _OPPONENT: _OPPONENT})
+    if _SEARCH_WORKER.get("root") != game.hash():
+        # a new move: age the tables of the worker like get_move() does, the
+        # passes of one move share them
+        _SEARCH_WORKER["root"] = game.hash()
+        if player.tt is not None:
+            player.tt.new_search()
+        if player.orderer is not None:
+            player.orderer.new_search()
+    game.apply_move(move)
+    with shared_alpha.get_lock():
+        alpha = (shared_alpha.value if shared_search.value == search_id
+                 else float("-inf"))
+
+    player._prepare_search(depth)
+    try:
+        score, _ = player._evaluate_alphabeta(
+            game, depth - 1, alpha, float("inf"), False)
+    except SearchTimeout:
+        return move, None, player.nodes, True
+
+    with shared_alpha.get_lock():
+        if shared_search.value == search_id and score > shared_alpha.value:
+            shared_alpha.value = score
+    return move, score, player.nodes, player._depth_cutoff
+
+
+def _lazy_smp_helper(task):
+    """Run the iterative deepening search of a Lazy SMP helper in a pool
+    worker until the search identified by `search_id` is stopped or its
+    deadline passes. Helpers only contribute through the shared
+    transposition table, so the result of their search is discarded.
+
+    Parameters
+    ----------
+    task : tuple
+        (board, deadline, search_id, generation, helper) where `board` is the
+        root position with the players replaced by `_SELF` and `_OPPONENT`,
+        `generation` is the transposition table generation of the search and
+        `helper` the index of the helper.
+
+    Returns
+    -------
+    int
+        The number of nodes searched by the helper.
+    """
+    board, deadline, search_id, generation, helper = task
+    player = _SEARCH_WORKER["player"]
+    shared_search = _SEARCH_WORKER["search"]
+
+    def time_left():
+        if shared_search.value != search_id:
+            return float("-inf")
+        return _millis_to(deadline)
+
+    # diversify the move order, and start every other helper one ply deeper
+    random.seed(search_id * 1000003 + helper)
+    player.time_left = time_left
+    player.tt.generation = generation
+    player._pv = []
+    player._root_scores = {}
+    game = _with_players(board, {_SELF: player, _OPPONENT: _OPPONENT})
+    nodes = 0
+    search_depth = 1 + helper % 2
+    while True:
+        try:
+            player.alphabeta(game, search_depth)
+        except SearchTimeout:
+            return nodes + player.nodes
+        nodes += player.nodes
+        if player.resolved:
+            return nodes
+        search_depth += 1
+
+
+def _ponder(task):
+    """Search the positions after the opponent replies in a pool worker
+    while the opponent is thinking, deepening one ply at a time over all the
+    replies until the ponder search identified by `search_id` is stopped, its
+    deadline passes or every reply is resolved (see
+    `AlphaBetaPlayer.resolved`). The results reach the player through the
+    shared transposition table.
+
+    Parameters
+    ----------
+    task : tuple
+        (board, replies, deadline, search_id, generation) where `board` is
+        the position after the move of the player with the players replaced
+        by `_SELF` and `_OPPONENT`, `replies` the opponent moves to ponder,
+        and `generation` the transposition table generation of the last
+        search of the player.
+
+    Returns
+    -------
+    int
+        The number of nodes searched while pondering.
+    """
+    board, replies, deadline, search_id, generation = task
+    player = _SEARCH_WORKER["player"]
+    shared_search = _SEARCH_WORKER["search"]
+
+    def time_left():
+        if shared_search.value != search_id:
+            return float("-inf")
+        return _millis_to(deadline)
+
+    player.time_left = time_left
+    player.tt.generation = generation
+    game = _with_players(board, {_SELF: player, _OPPONENT: _OPPONENT})
+    nodes = 0
+    search_depth = 1
+    while replies:
+        unresolved = []
+        for reply in replies:
+            player._pv = []
+            player._root_scores = {}
+            try:
+                player.alphabeta(game.forecast_move(reply), search_depth)
+            except SearchTimeout:
+                return nodes + player.nodes
+            nodes += player.nodes
+            if not player.resolved:
+                unresolved.append(reply)
+        replies = unresolved
+        search_depth += 1
+    return nodes
+
+
+class _QueriedFeatures(object):
+    """The features of `isolation.Board.features`, computed with the queries
+    of boards that do not extract them, like the board of the PvP
+    competition; see `_features`.
+    """
+
+    def __init__(self, game, player):
+        opponent = game.get_opponent(player)
+        self.own_moves = frozenset(game.get_legal_moves(player))
+        self.opp_moves = frozenset(game.get_legal_moves(opponent))
+        self.own_mobility = len(self.own_moves)
+        self.opp_mobility = len(self.opp_moves)
+        self.overlap = len(self.own_moves & self.opp_moves)
+        self.is_winner = game.is_winner(player)
+        self.is_loser = game.is_loser(player)
+        self.is_active = game.active_player == player
+        self.own_location = game.get_player_location(player)
+        self.opp_location = game.get_player_location(opponent)
+
+
+def _features(game, player):
+    """Return the features of `game` from the point of view of `player`, see
+    `isolation.Board.features`, also on boards without `features`.
+    """
+    if hasattr(game, "features"):
+        return game.features(player)
+    return _QueriedFeatures(game, player)
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -48,29 +346,26 @@ def custom_score(game, player):
         The heuristic value of the current game state to the specified player.
     """
 
-    if game.is_loser(player):
+    features = _features(game, player)
+
+    if features.is_loser:
         return float("-inf")
 
-    if game.is_winner(player):
+    if features.is_winner:
         return float("inf")
 
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-
     # --- relative_mobility
     # own mobility vs opponent's (normalized [-1.0 ... 1.0])
-    own_mobility = len(own_moves)
-    opp_mobility = len(opp_moves)
+    own_mobility = features.own_mobility
+    opp_mobility = features.opp_mobility
     relative_mobility = ((own_mobility - opp_mobility) /
                          max(own_mobility, opp_mobility))
 
     # --- opponent_block_ability
     # ability to block opponent on next move
     opponent_block_ability = 0
-    if game.active_player == player:
-        opponent_block_ability = (
-            1 if len(set(own_moves) & set(opp_moves)) != 0
-            else 0)
+    if features.is_active:
+        opponent_block_ability = 1 if features.overlap != 0 else 0
 
     # score is calculated using weights for the normalized params
     return float(55 * relative_mobility +
@@ -117,23 +412,22 @@ def custom_score_2(game, player):
         The heuristic value of the current game state to the specified player.
     """
 
-    if game.is_loser(player):
+    features = _features(game, player)
+
+    if features.is_loser:
         return float("-inf")
 
-    if game.is_winner(player):
+    if features.is_winner:
         return float("inf")
 
-    player_location = game.get_player_location(player)
-    opponent_location = game.get_player_location(game.get_opponent(player))
+    player_location = features.own_location
+    opponent_location = features.opp_location
     board_center = ((game.width - 1) / 2, (game.height - 1) / 2)
 
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-
     # --- relative_mobility
     # own mobility vs opponent's (normalized [-1.0 ... 1.0])
-    own_mobility = len(own_moves)
-    opp_mobility = len(opp_moves)
+    own_mobility = features.own_mobility
+    opp_mobility = features.opp_mobility
     relative_mobility = ((own_mobility - opp_mobility) /
                          max(own_mobility, opp_mobility))
 
@@ -150,16 +444,14 @@ def custom_score_2(game, player):
     # --- center_ability
     # ability to take over the center on next move
     center_ability = 0
-    if game.active_player == player:
-        center_ability = 1 if (cx, cy) in own_moves else 0
+    if features.is_active:
+        center_ability = 1 if (cx, cy) in features.own_moves else 0
 
     # --- opponent_block_ability
     # ability to block opponent on next move
     opponent_block_ability = 0
-    if game.active_player == player:
-        opponent_block_ability = (
-            1 if len(set(own_moves) & set(opp_moves)) != 0
-            else 0)
+    if features.is_active:
+        opponent_block_ability = 1 if features.overlap != 0 else 0
 
     # score is calculated using weights for the normalized params
     return float(60 * relative_mobility +
@@ -205,31 +497,308 @@ def custom_score_3(game, player):
         The heuristic value of the current game state to the specified player.
     """
 
-    if game.is_loser(player):
+    features = _features(game, player)
+
+    if features.is_loser:
         return float("-inf")
 
-    if game.is_winner(player):
+    if features.is_winner:
         return float("inf")
 
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-
     # --- own_mobility
-    own_mobility = len(own_moves)
+    own_mobility = features.own_mobility
 
     # --- opponent_block_ability
     # ability to block opponent on next move
     opponent_block_ability = 0
-    if game.active_player == player:
-        opponent_block_ability = (
-            1 if len(set(own_moves) & set(opp_moves)) != 0
-            else 0)
+    if features.is_active:
+        opponent_block_ability = 1 if features.overlap != 0 else 0
 
     # score is calculated using weights for the params
     return float(10 * opponent_block_ability +
                  2 * own_mobility)
 
 
+# Features available to `compile_heuristic`, mapped to the features they
+# depend on and the statements computing them from `game`, `player` and
+# `features` (the result of `_features`). Names starting with an
+# underscore are intermediate values that cannot be weighted.
+HEURISTIC_FEATURES = {
+    "own_mobility": (
+        (), "own_mobility = features.own_mobility"),
+    "opp_mobility": (
+        (), "opp_mobility = features.opp_mobility"),
+    "mobility_difference": (
+        ("own_mobility", "opp_mobility"),
+        "mobility_difference = own_mobility - opp_mobility"),
+    "relative_mobility": (
+        ("own_mobility", "opp_mobility"),
+        "relative_mobility = ((own_mobility - opp_mobility) /\n"
+        "                     max(own_mobility, opp_mobility))"),
+    "opponent_block_ability": (
+        (), "opponent_block_ability = 0\n"
+            "if features.is_active:\n"
+            "    opponent_block_ability = 1 if features.overlap != 0 else 0"),
+    "_center": (
+        (), "cy, cx = ((game.width - 1) / 2, (game.height - 1) / 2)"),
+    "relative_center_domination": (
+        ("_center",),
+        "py, px = features.own_location\n"
+        "oy, ox = features.opp_location\n"
+        "player_distance = (((cx - px) + (cy - py))**2 / (cx + cy)**2)\n"
+        "opponent_distance = (((cx - ox) + (cy - oy))**2 / (cx + cy)**2)\n"
+        "relative_center_domination = opponent_distance - player_distance"),
+    "center_ability": (
+        ("_center",),
+        "center_ability = 0\n"
+        "if features.is_active:\n"
+        "    center_ability = 1 if (cx, cy) in features.own_moves else 0"),
+}
+
+# Statements computing the features of `HEURISTIC_FEATURES` from the
+# `FrontierFeatures` of a batch of positions, where they differ
+BATCH_HEURISTIC_FEATURES = {
+    "relative_mobility": (
+        "relative_mobility = ((own_mobility - opp_mobility) /\n"
+        "                     numpy.maximum(own_mobility, opp_mobility))"),
+    "opponent_block_ability": (
+        "opponent_block_ability = 0\n"
+        "if features.is_active:\n"
+        "    opponent_block_ability = (features.overlap != 0) * 1"),
+    "center_ability": (
+        "center_ability = 0\n"
+        "if features.is_active:\n"
+        "    center_ability = features.own_moves_contain((cx, cy)) * 1"),
+}
+
+# Weights of the features combined by custom_score, custom_score_2 and
+# custom_score_3, in summation order
+CUSTOM_SCORE_WEIGHTS = (
+    ("relative_mobility", 55), ("opponent_block_ability", 45))
+CUSTOM_SCORE_2_WEIGHTS = (
+    ("relative_mobility", 60), ("own_mobility", 15),
+    ("relative_center_domination", 10), ("center_ability", 5),
+    ("opponent_block_ability", 10))
+CUSTOM_SCORE_3_WEIGHTS = (
+    ("opponent_block_ability", 10), ("own_mobility", 2))
+
+
+def compile_heuristic(weights, name="compiled_heuristic"):
+    """Compile a weighted sum of the features in `HEURISTIC_FEATURES` into a
+    specialized heuristic function.
+
+    The generated function extracts the board features once, returns -inf or
+    +inf in terminal states, computes each feature with a non-zero weight and
+    its dependencies once, and returns the weighted sum in the order of
+    `weights`, so it reproduces the hand-written heuristics exactly (e.g.,
+    `compile_heuristic(CUSTOM_SCORE_WEIGHTS)` for `custom_score`).
+
+    Parameters
+    ----------
+    weights : dict or iterable<(str, numeric)>
+        The (feature name, weight) pairs of the sum, in summation order.
+
+    name : str (optional)
+        The name of the generated function.
+
+    Returns
+    -------
+    `CompiledHeuristic`
+        A heuristic `fn(game, player)`; its `weights` attribute holds the
+        (name, weight) pairs and its `source` attribute the generated code.
+    """
+    return CompiledHeuristic(weights, name)
+
+
+def _heuristic_source(weights, name):
+    """Return the validated (feature, weight) pairs of `weights` and the
+    source code of their heuristic; see compile_heuristic().
+    """
+    if isinstance(weights, dict):
+        weights = weights.items()
+    weights = tuple((feature, weight) for feature, weight in weights)
+    for feature, weight in weights:
+        if feature.startswith("_") or feature not in HEURISTIC_FEATURES:
+            raise ValueError("Unknown heuristic feature: {}".format(feature))
+        if not isinstance(weight, (int, float)):
+            raise TypeError("Weight of {} is not a number: {!r}".format(
+                feature, weight))
+
+    computed = []
+
+    def compute(feature):
+        if feature in computed:
+            return
+        depends, _ = HEURISTIC_FEATURES[feature]
+        for dependency in depends:
+            compute(dependency)
+        computed.append(feature)
+
+    terms = []
+    for feature, weight in weights:
+        if weight:
+            compute(feature)
+            terms.append("{!r} * {}".format(weight, feature))
+    statements = [HEURISTIC_FEATURES[feature][1] for feature in computed]
+    batch_statements = [
+        BATCH_HEURISTIC_FEATURES.get(feature, HEURISTIC_FEATURES[feature][1])
+        for feature in computed]
+
+    lines = ["def {}(game, player):".format(name),
+             "    features = _features(game, player)",
+             "    if features.is_loser:",
+             "        return float(\"-inf\")",
+             "    if features.is_winner:",
+             "        return float(\"inf\")"]
+    lines.extend(_indent(statements, 1))
+    lines.append("    return float({})".format(
+        " +\n                 ".join(terms) or "0"))
+
+    # the batch version scores the children of a position at once, or one
+    # at a time when the positions cannot be batched
+    lines.extend(["", "",
+                  "def {}_batch(game, moves, player):".format(name),
+                  "    features = FrontierFeatures.extract(game, moves, player)",
+                  "    if features is None:",
+                  "        return [{}(game.forecast_move(move), player)".format(
+                      name),
+                  "                for move in moves]",
+                  "    with numpy.errstate(divide=\"ignore\", "
+                  "invalid=\"ignore\"):"])
+    lines.extend(_indent(batch_statements, 2))
+    lines.extend(["        score = numpy.broadcast_to({}, (len(moves),))".format(
+                      " +\n                 ".join(terms) or "0."),
+                  "    return numpy.where(",
+                  "        features.is_loser, -numpy.inf, numpy.where(",
+                  "            features.is_winner, numpy.inf, score)).tolist()"])
+    return weights, "\n".join(lines) + "\n"
+
+
+class CompiledHeuristic(object):
+    """Heuristic function generated by compile_heuristic().
+
+    Generated functions cannot be pickled, so the heuristic is pickled by its
+    weights and compiled again when loaded, e.g., by the worker processes of
+    a tournament.
+
+    Parameters
+    ----------
+    weights : dict or iterable<(str, numeric)>
+        The (feature name, weight) pairs of the sum, in summation order.
+
+    name : str (optional)
+        The name of the generated function.
+
+    Attributes
+    ----------
+    weights : tuple<(str, numeric)>
+        The (feature name, weight) pairs of the sum.
+
+    source : str
+        The generated code.
+
+    batch : callable
+        The batch version `batch(game, moves, player)` of the heuristic,
+        only when NumPy is installed; see `AlphaBetaPlayer`.
+    """
+
+    def __init__(self, weights, name="compiled_heuristic"):
+        self.weights, self.source = _heuristic_source(weights, name)
+        self.name = name
+        namespace = {"numpy": numpy, "FrontierFeatures": FrontierFeatures,
+                     "_features": _features}
+        exec(compile(self.source, "<heuristic {}>".format(name), "exec"),
+             namespace)
+        self._heuristic = namespace[name]
+        if numpy is not None:
+            self.batch = namespace[name + "_batch"]
+
+    def __call__(self, game, player):
+        return self._heuristic(game, player)
+
+    def __reduce__(self):
+        return CompiledHeuristic, (self.weights, self.name)
+
+
+def _indent(statements, level):
+    """Return the lines of `statements` indented by `level` levels."""
+    return ["    " * level + line
+            for statement in statements for line in statement.split("\n")]
+
+
+class FrontierFeatures:
+    """Features of the positions reached by each of a list of moves of the
+    active player, from the point of view of a player, held in NumPy arrays
+    with one entry per move; see `isolation.Features` for the attributes.
+
+    Attributes that are the same for every move, such as `is_active` or the
+    location of the player that does not move, are scalars instead. Build
+    instances with `FrontierFeatures.extract`.
+    """
+
+    @classmethod
+    def extract(cls, game, moves, player):
+        """Return the features of the positions after each move in `moves`
+        from the point of view of `player`, or None if NumPy is not available.
+        """
+        if numpy is None:
+            return None
+        resting = game.get_player_location(game.inactive_player)
+        height = game.height
+        adjacency = knight_adjacency(game.width, height)
+
+        free = numpy.zeros(adjacency.shape[1], dtype=bool)
+        free[[r + c * height for r, c in game.get_blank_spaces()]] = True
+        cells = numpy.array(moves).reshape(-1, 2)
+        targets = cells[:, 0] + cells[:, 1] * height
+
+        self = cls.__new__(cls)
+        self._height = height
+        self._targets = targets
+        # moves of the player that moved, and of the other one in every child
+        self._mover_moves = adjacency[targets] & free
+        if resting is None:
+            self._resting_moves = free
+        else:
+            self._resting_moves = (
+                adjacency[resting[0] + resting[1] * height] & free)
+        mover_mobility = self._mover_moves.sum(axis=1)
+        resting_mobility = (self._resting_moves.sum() -
+                            self._resting_moves[targets])
+        self.overlap = (self._mover_moves & self._resting_moves).sum(axis=1)
+
+        # the player that moved is inactive in every child
+        self.is_active = player != game.active_player
+        mover_location = (cells[:, 0], cells[:, 1])
+        if self.is_active:
+            self.own_mobility, self.opp_mobility = (resting_mobility,
+                                                    mover_mobility)
+            self.own_location, self.opp_location = resting, mover_location
+            self.is_loser = self.own_mobility == 0
+            self.is_winner = False
+        else:
+            self.own_mobility, self.opp_mobility = (mover_mobility,
+                                                    resting_mobility)
+            self.own_location, self.opp_location = mover_location, resting
+            self.is_loser = False
+            self.is_winner = self.opp_mobility == 0
+        return self
+
+    def own_moves_contain(self, move):
+        """Return a boolean array telling whether `move` is a legal move of
+        the player in each position.
+        """
+        r, c = move
+        height, width = self._height, len(self._resting_moves) // self._height
+        if r != int(r) or c != int(c) or not (0 <= r < height and
+                                              0 <= c < width):
+            return numpy.zeros(len(self._targets), dtype=bool)
+        idx = int(r) + int(c) * height
+        if self.is_active:
+            return self._resting_moves[idx] & (self._targets != idx)
+        return self._mover_moves[:, idx]
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -264,8 +833,23 @@ class MinimaxPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    inplace : bool (optional)
+        If True, search on the board received by get_move() using
+        `Board.push_move` and `Board.pop_move` instead of allocating a new
+        board with `Board.forecast_move` at every node.
+
+    See `IsolationPlayer` for the remaining parameters.
     """
 
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 inplace=False):
+        super().__init__(search_depth, score_fn, timeout)
+        self.inplace = inplace
+        self._best_move = (-1, -1)
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -296,6 +880,9 @@ class MinimaxPlayer(IsolationPlayer):
         """
 
         self.time_left = time_left
+        self._best_move = (-1, -1)
+        if isinstance(self.score, EvalCache):
+            self.score.new_search(game)
 
         try:
             # The try/except block will automatically catch the exception
@@ -305,8 +892,9 @@ class MinimaxPlayer(IsolationPlayer):
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
-        # Return the best move from the last completed search iteration
-        return (-1, -1)
+        # Return the best root move found before the timer expired, so that
+        # an exhausted node budget does not forfeit the game
+        return self._best_move
 
     def minimax(self, game, depth):
         """Implement depth-limited minimax search algorithm as described in
@@ -351,9 +939,9 @@ class MinimaxPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
-        return self._evaluate_minimax(game, depth)[1]
+        return self._evaluate_minimax(game, depth, root=True)[1]
 
-    def _evaluate_minimax(self, game, depth, maximize=True):
+    def _evaluate_minimax(self, game, depth, maximize=True, root=False):
         """Evaluates nodes per minimax logic
 
         Parameters
@@ -369,6 +957,10 @@ class MinimaxPlayer(IsolationPlayer):
         maximize : boolean
             True if it's a maximize node. False otherwise.
 
+        root : boolean
+            True at the root of the search, whose best move so far is kept in
+            `_best_move` in case the search times out.
+
         Returns
         -------
         tuple
@@ -385,30 +977,745 @@ class MinimaxPlayer(IsolationPlayer):
             return self.score(game, self), (-1, -1)
 
         best_move = (-1, -1)
+        if root:
+            # a lost root still returns a legal move
+            best_move = self._best_move = moves[0]
         if maximize:
             # maximize
             best_score = float("-inf")
             for m in moves:
-                forecast = game.forecast_move(m)
-                score, _ = self._evaluate_minimax(forecast, depth - 1, False)
+                forecast = _make_move(game, m, self.inplace)
+                try:
+                    score, _ = self._evaluate_minimax(
+                        forecast, depth - 1, False)
+                finally:
+                    _unmake_move(game, self.inplace)
                 if score > best_score:
                     best_score, best_move = score, m
+                    if root:
+                        self._best_move = m
         else:
             # minimize
             best_score = float("inf")
             for m in moves:
-                forecast = game.forecast_move(m)
-                score, _ = self._evaluate_minimax(forecast, depth - 1, True)
+                forecast = _make_move(game, m, self.inplace)
+                try:
+                    score, _ = self._evaluate_minimax(
+                        forecast, depth - 1, True)
+                finally:
+                    _unmake_move(game, self.inplace)
                 if score < best_score:
                     best_score, best_move = score, m
         return best_score, best_move
 
 
+class TranspositionTable:
+    """Bounded table of search results keyed by `Board.hash()`.
+
+    Each entry records the score of a position, the depth it was searched to,
+    whether the score is exact or a lower/upper bound, and the best move
+    found. Positions are mapped to a fixed number of slots, and the
+    replacement policy decides which entry survives when two positions
+    compete for the same slot.
+
+    A table holds scores from the point of view of the player searching, so
+    it must not be shared between players.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The maximum number of entries held by the table.
+
+    max_bytes : int (optional)
+        Memory cap for the table, converted to a number of entries with the
+        approximate per-entry footprint `ENTRY_BYTES`. When both caps are
+        given the smaller one applies.
+
+    policy : str (optional)
+        'depth' keeps the entry searched deepest (entries from earlier
+        searches are always replaceable), 'always' keeps the newest entry, and
+        'two_tier' keeps one slot of each kind per position.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+    POLICIES = ("depth", "always", "two_tier")
+    ENTRY_BYTES = 200
+
+    def __init__(self, max_entries=None, max_bytes=None, policy="depth"):
+        if policy not in self.POLICIES:
+            raise ValueError("Unknown replacement policy: {}".format(policy))
+        if max_entries is None and max_bytes is None:
+            max_entries = 1 << 16
+        if max_bytes is not None:
+            byte_entries = max_bytes // self.ENTRY_BYTES
+            max_entries = (byte_entries if max_entries is None
+                           else min(max_entries, byte_entries))
+        self.policy = policy
+        self.buckets = max(1, max_entries // 2 if policy == "two_tier"
+                           else max_entries)
+        self.size = 2 * self.buckets if policy == "two_tier" else self.buckets
+        self._allocate()
+        self.generation = 0
+        self.probes = self.hits = self.collisions = 0
+        self.stores = self.overwrites = self.rejections = 0
+
+    def _allocate(self):
+        """Allocate `size` empty slots."""
+        self._slots = [None] * self.size
+
+    def _read(self, idx):
+        """Return the entry held in slot `idx`, or None."""
+        return self._slots[idx]
+
+    def _write(self, idx, entry):
+        """Replace the entry held in slot `idx` (None empties the slot)."""
+        self._slots[idx] = entry
+
+    def __len__(self):
+        return sum(self._read(idx) is not None for idx in range(self.size))
+
+    def new_search(self):
+        """Mark the entries stored so far as belonging to a previous search,
+        so the 'depth' policy can replace them regardless of their depth.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        for idx in range(self.size):
+            self._write(idx, None)
+        self.probes = self.hits = self.collisions = 0
+        self.stores = self.overwrites = self.rejections = 0
+
+    def probe(self, key):
+        """Return the entry stored for `key` as a tuple (key, depth, score,
+        flag, move, generation), or None if the position is not in the table.
+        """
+        self.probes += 1
+        if self.policy == "two_tier":
+            idx = 2 * (key % self.buckets)
+            candidates = (self._read(idx), self._read(idx + 1))
+        else:
+            candidates = (self._read(key % self.buckets),)
+        occupied = False
+        for entry in candidates:
+            if entry is not None:
+                if entry[0] == key:
+                    self.hits += 1
+                    return entry
+                occupied = True
+        if occupied:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """Record the result of searching the position `key` to `depth`."""
+        entry = (key, depth, score, flag, move, self.generation)
+        if self.policy == "two_tier":
+            idx = 2 * (key % self.buckets)
+            deep = self._read(idx)
+            if (deep is None or deep[0] == key or depth >= deep[1] or
+                    deep[5] != self.generation):
+                self._write(idx, entry)
+                recent = self._read(idx + 1)
+                if deep is not None and deep[0] != key:
+                    # demote the replaced entry to the always-replace slot
+                    self.overwrites += 1
+                    self._write(idx + 1, deep)
+                elif recent is not None and recent[0] == key:
+                    self._write(idx + 1, None)
+            else:
+                recent = self._read(idx + 1)
+                if recent is not None and recent[0] != key:
+                    self.overwrites += 1
+                self._write(idx + 1, entry)
+            self.stores += 1
+            return
+
+        idx = key % self.buckets
+        old = self._read(idx)
+        if old is not None and old[0] != key:
+            if (self.policy == "depth" and depth < old[1] and
+                    old[5] == self.generation):
+                self.rejections += 1
+                return
+            self.overwrites += 1
+        self._write(idx, entry)
+        self.stores += 1
+
+    def stats(self):
+        """Return the usage counters of the table as a dict."""
+        return {"slots": self.size, "entries": len(self),
+                "probes": self.probes, "hits": self.hits,
+                "hit_rate": self.hits / self.probes if self.probes else 0.,
+                "collisions": self.collisions, "stores": self.stores,
+                "overwrites": self.overwrites, "rejections": self.rejections}
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table held in `multiprocessing.shared_memory`, so that
+    every process attached to it reads and writes the same entries.
+
+    Each slot holds three 64-bit words: a check word, the score and the
+    packed depth, bound type, move and search generation. The check word is
+    the XOR of the key with the two other words, so the table needs no
+    locks: an entry torn by concurrent writers decodes to a key that does not
+    match any probe and is ignored. Keys must be stable across processes,
+    which the Zobrist keys of `Board.hash()` are.
+
+    Tables are pickled by name, so a copy sent to a worker process attaches to
+    the same memory. The process that created the table must call close()
+    to release it; see `TranspositionTable` for the parameters.
+    """
+    ENTRY_BYTES = 24
+    _ENTRY = struct.Struct("<QQQ")
+    _SCORE = struct.Struct("<d")
+    _BITS = struct.Struct("<Q")
+
+    def _allocate(self):
+        from multiprocessing import shared_memory
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.size * self.ENTRY_BYTES)
+        self._shm.buf[:self.size * self.ENTRY_BYTES] = bytes(
+            self.size * self.ENTRY_BYTES)
+        self._owner = True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_shm=self._shm.name, _owner=False)
+        return state
+
+    def __setstate__(self, state):
+        from multiprocessing import shared_memory
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+
+    def close(self):
+        """Detach from the shared memory, and free it if this process
+        created the table.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+    def _read(self, idx):
+        check, score_bits, data = self._ENTRY.unpack_from(
+            self._shm.buf, idx * self.ENTRY_BYTES)
+        if not data:
+            return None
+        score, = self._SCORE.unpack(self._BITS.pack(score_bits))
+        row, col = (data >> 24 & 0xFF) - 1, (data >> 16 & 0xFF) - 1
+        return (check ^ score_bits ^ data, data >> 40, score,
+                data >> 32 & 0xFF, (row, col), data & 0xFFFF)
+
+    def _write(self, idx, entry):
+        if entry is None:
+            self._ENTRY.pack_into(self._shm.buf, idx * self.ENTRY_BYTES,
+                                  0, 0, 0)
+            return
+        key, depth, score, flag, move, generation = entry
+        score_bits, = self._BITS.unpack(self._SCORE.pack(score))
+        data = (depth << 40 | flag << 32 | (move[0] + 1) << 24 |
+                (move[1] + 1) << 16 | generation & 0xFFFF)
+        self._ENTRY.pack_into(self._shm.buf, idx * self.ENTRY_BYTES,
+                              key ^ score_bits ^ data, score_bits, data)
+
+    def new_search(self):
+        # generations wrap around with the 16 bits stored per entry
+        self.generation = (self.generation + 1) & 0xFFFF
+
+
+class EvalCache:
+    """Heuristic evaluation function with a bounded cache of its results,
+    keyed by `Board.hash()` and player, evicting the least recently used
+    entries first.
+
+    Pass an instance as the `score_fn` of `MinimaxPlayer` or
+    `AlphaBetaPlayer` to reuse the scores of positions evaluated again
+    across iterative deepening passes and sibling subtrees; pass the
+    heuristic itself to search without a cache. The player calls
+    new_search() at the start of every move.
+
+    Parameters
+    ----------
+    score_fn : callable
+        The heuristic evaluation function `score_fn(game, player)` to cache.
+
+    max_entries : int (optional)
+        The maximum number of scores held by the cache.
+
+    scope : str (optional)
+        'move' keeps the scores for the duration of one call to get_move(),
+        and 'game' keeps them across the moves of a game.
+    """
+    SCOPES = ("move", "game")
+
+    def __init__(self, score_fn, max_entries=1 << 16, scope="move"):
+        if scope not in self.SCOPES:
+            raise ValueError("Unknown cache scope: {}".format(scope))
+        self.score_fn = score_fn
+        self.max_entries = max_entries
+        self.scope = scope
+        self._scores = OrderedDict()
+        self._move_count = -1
+        self.hits = self.misses = self.evictions = 0
+
+    def __call__(self, game, player):
+        key = (game.hash(), player)
+        scores = self._scores
+        score = scores.get(key)
+        if score is not None:
+            self.hits += 1
+            scores.move_to_end(key)
+            return score
+        self.misses += 1
+        score = scores[key] = self.score_fn(game, player)
+        if len(scores) > self.max_entries:
+            scores.popitem(last=False)
+            self.evictions += 1
+        return score
+
+    def __len__(self):
+        return len(self._scores)
+
+    def new_search(self, game):
+        """Drop the cached scores if they are out of scope when searching the
+        position `game`: always with the 'move' scope, and when `game` is
+        not a later position than the last search with the 'game' scope.
+        """
+        if self.scope == "move" or game.move_count <= self._move_count:
+            self._scores.clear()
+        self._move_count = game.move_count
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._scores.clear()
+        self._move_count = -1
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the usage counters of the cache as a dict."""
+        lookups = self.hits + self.misses
+        return {"entries": len(self), "lookups": lookups, "hits": self.hits,
+                "hit_rate": self.hits / lookups if lookups else 0.,
+                "evictions": self.evictions}
+
+
+class TimeManager:
+    """Time control of iterative deepening: record the duration and node
+    count of every pass, and only start the next pass if it is predicted to
+    finish in the time left, so that no pass is abandoned half-way when the
+    time is predictable.
+
+    The next pass is predicted to take the time of the last one times the
+    effective branching factor, the ratio of the nodes of the last two
+    passes (the largest of the last two ratios, since alpha-beta search
+    alternates between cheaper and costlier depths), times `safety`.
+
+    Pass an instance as the `time_manager` of `AlphaBetaPlayer`; the player
+    calls new_move() at the start of every move and record() after every
+    completed pass.
+
+    Parameters
+    ----------
+    move_millis : float (optional)
+        The time budget of a move in milliseconds; the search of a move
+        stops at the budget even if the time limit of the turn is later.
+
+    move_fraction : float (optional)
+        The time budget of a move as a fraction of the time left at its
+        start; combined with `move_millis`, the smaller budget applies.
+
+    safety : float (optional)
+        The margin applied to the predicted duration of the next pass.
+
+    branching : float (optional)
+        The effective branching factor assumed until two passes are done.
+
+    Attributes
+    ----------
+    depth_times : list<(int, int, float)>
+        The (depth, nodes, milliseconds) of the passes completed in the
+        current move.
+
+    searched_millis, wasted_millis : float
+        The total time of the completed passes, and of the passes abandoned
+        on timeout, over all moves.
+
+    skipped_passes : int
+        The number of passes not started because they were predicted to run
+        out of time.
+    """
+
+    def __init__(self, move_millis=None, move_fraction=None, safety=1.2,
+                 branching=4.):
+        self.move_millis = move_millis
+        self.move_fraction = move_fraction
+        self.safety = safety
+        self.branching = branching
+        self.depth_times = []
+        self.searched_millis = self.wasted_millis = 0.
+        self.skipped_passes = 0
+        self._start = self._pass_start = timeit.default_timer()
+
+    def new_move(self, time_left):
+        """Start timing a move, and return the `time_left` function of its
+        search, which also runs out at the move budget if there is one. The
+        `charge` method of a node limited `time_left` (see
+        `isolation.SearchBudget.charge`) is kept.
+        """
+        self.depth_times = []
+        self._start = self._pass_start = timeit.default_timer()
+        budget = self.move_millis
+        if self.move_fraction is not None:
+            fraction = self.move_fraction * time_left()
+            budget = fraction if budget is None else min(budget, fraction)
+        if budget is None:
+            return time_left
+
+        def budget_left():
+            return min(time_left(), budget - self.elapsed())
+        if hasattr(time_left, "charge"):
+            budget_left.charge = time_left.charge
+        return budget_left
+
+    def elapsed(self):
+        """Return the number of milliseconds elapsed in the current move."""
+        return 1000 * (timeit.default_timer() - self._start)
+
+    def record(self, depth, nodes):
+        """Record the completion of the pass to `depth` after searching
+        `nodes` nodes.
+        """
+        now = timeit.default_timer()
+        millis = 1000 * (now - self._pass_start)
+        self._pass_start = now
+        self.depth_times.append((depth, nodes, millis))
+        self.searched_millis += millis
+
+    def abandon(self):
+        """Record that the current pass was abandoned on timeout."""
+        self.wasted_millis += 1000 * (timeit.default_timer() -
+                                      self._pass_start)
+
+    def effective_branching_factor(self):
+        """Return the effective branching factor of the last passes."""
+        nodes = [n for _, n, _ in self.depth_times[-3:]]
+        ratios = [b / a for a, b in zip(nodes, nodes[1:]) if a]
+        return max(ratios) if ratios else self.branching
+
+    def predict(self):
+        """Return the predicted duration in milliseconds of the next pass."""
+        if not self.depth_times:
+            return 0.
+        return (self.depth_times[-1][2] * self.effective_branching_factor() *
+                self.safety)
+
+    def can_finish(self, remaining):
+        """Return True if the next pass is predicted to finish in `remaining`
+        milliseconds; otherwise count it as skipped.
+        """
+        if self.predict() < remaining:
+            return True
+        self.skipped_passes += 1
+        return False
+
+
+class MoveOrderer:
+    """Move ordering for alpha-beta search based on the killer-move and the
+    history heuristics.
+
+    Killer moves are the last moves that caused a beta cutoff at each ply of
+    the search; the history table accumulates a bonus of depth squared for
+    every cutoff caused by a move, indexed by the side to move (0 for the
+    searching player, 1 for its opponent) and the destination cell. Moves
+    are searched killers first, then by decreasing history score, replacing
+    the random order returned by `Board.get_legal_moves`.
+
+    Parameters
+    ----------
+    killers : bool (optional)
+        Whether to search the killer moves of the ply first.
+
+    history : bool (optional)
+        Whether to order the remaining moves by their history score.
+
+    killer_slots : int (optional)
+        The number of killer moves remembered per ply.
+    """
+    KILLER_BONUS = 1 << 30
+
+    def __init__(self, killers=True, history=True, killer_slots=2):
+        self.use_killers = killers
+        self.use_history = history
+        self.killer_slots = killer_slots
+        self.killers = []
+        self.history = [{}, {}]
+
+    def new_search(self):
+        """Forget the killer moves and age the history table before
+        searching a new position.
+        """
+        self.killers = []
+        for table in self.history:
+            for move in table:
+                table[move] >>= 1
+
+    def order(self, moves, ply, side):
+        """Sort `moves` in place, most promising first."""
+        history = self.history[side] if self.use_history else {}
+        killers = ()
+        if self.use_killers and ply < len(self.killers):
+            killers = self.killers[ply]
+        bonus = self.KILLER_BONUS
+        moves.sort(key=lambda m: history.get(m, 0) + (
+            bonus >> killers.index(m) if m in killers else 0), reverse=True)
+
+    def cutoff(self, move, ply, side, depth):
+        """Record that `move` caused a cutoff at `ply` with `depth` plies
+        left to search.
+        """
+        if self.use_killers:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            killers = self.killers[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self.killer_slots:]
+        if self.use_history:
+            table = self.history[side]
+            table[move] = table.get(move, 0) + depth * depth
+
+
+# Move ordering strategies selectable by name in `AlphaBetaPlayer`
+MOVE_ORDERINGS = {
+    "none": lambda: None,
+    "killer": lambda: MoveOrderer(history=False),
+    "history": lambda: MoveOrderer(killers=False),
+    "killer_history": lambda: MoveOrderer(),
+}
+
+
 class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    inplace : bool (optional)
+        If True, search on the board received by get_move() using
+        `Board.push_move` and `Board.pop_move` instead of allocating a new
+        board with `Board.forecast_move` at every node.
+
+    transposition_table : `TranspositionTable` (optional)
+        A table used to reuse results of positions reached more than once,
+        both within a search and across iterative deepening passes and
+        moves. Each player needs its own table.
+
+    move_ordering : str or `MoveOrderer` (optional)
+        The move ordering strategy used inside the search: one of the names
+        in `MOVE_ORDERINGS`, or a `MoveOrderer` instance. The default 'none'
+        keeps the order returned by `Board.get_legal_moves`.
+
+    processes : int (optional)
+        If greater than 1, search in parallel with the `parallel` mode. The
+        worker pool is started by start() (or on the first move) and kept
+        until close().
+
+    parallel : str (optional)
+        'root' splits the root moves of every iterative deepening pass across
+        a pool of `processes` workers. The first root move is searched alone
+        so its score can bound the others, which are then searched in
+        parallel while sharing the best score found.
+
+        'lazy_smp' runs the same iterative deepening search in this process
+        and in `processes - 1` helper processes, all sharing one
+        `SharedTranspositionTable` (created from the size and policy of
+        `transposition_table` if that is not already shared).
+
+    ponder : str (optional)
+        If set, keep searching in a background worker process after returning
+        a move, until the next call to get_move(): 'predicted' searches the
+        position after the opponent reply predicted by the principal
+        variation (or every reply when there is no prediction), and 'all'
+        searches the positions after every reply. The worker fills a
+        `SharedTranspositionTable` (created like for 'lazy_smp'), so the
+        search after the actual reply starts from a warm table, and falls
+        back on the best move found while pondering if no pass completes.
+        Pondering uses a CPU core while the opponent is thinking, and stops
+        after `PONDER_MILLIS` at the latest.
+
+    batch_frontier : bool (optional)
+        If True and `score_fn` has a `batch` attribute (like the heuristics
+        made by `compile_heuristic` when NumPy is installed), the children of
+        the nodes one ply above the search horizon are scored with a single
+        call to `score_fn.batch(game, moves, player)` before the pruning
+        decisions are made, instead of one call per child. Only nodes with at
+        least `BATCH_MIN_MOVES` children are batched, since a batch scores
+        (and counts) the children that would have been pruned too; this
+        pays off on the first moves of a game and on large boards. The
+        search result is unchanged.
+
+    time_manager : `TimeManager` (optional)
+        If set, iterative deepening only starts a pass that the manager
+        predicts to finish in the time left, and stops at its per-move
+        budget; otherwise passes are started until the time runs out.
+
+    endgame : bool (optional)
+        If True, get_move() switches to the exact solver of
+        `isolation.endgame` once the players are in separate regions of the
+        board: the move starting the longest knight path in the own region
+        is played instead of searching. The solver checks the time like the
+        search; when it runs out, the longest path found so far is played.
+
+    See `IsolationPlayer` for the remaining parameters.
+
+    Attributes
+    ----------
+    nodes : int
+        The number of nodes visited by the last call to alphabeta().
+
+    depth_nodes : list<(int, int)>
+        The (depth, nodes) pairs of the passes completed by the last call to
+        get_move().
+
+    resolved : bool
+        True if the last call to alphabeta() proved a win or a loss, or
+        reached the end of the game on every line it searched, so that
+        deeper passes cannot change its result. Iterative deepening stops
+        there instead of waiting for the timeout.
+
+    ponder_hits, ponder_misses : int
+        The number of opponent replies that had, or had not, been pondered.
+
+    endgame_lengths : (int, int) or None
+        The longest path lengths of this player and its opponent if the last
+        call to get_move() was answered by the endgame solver (None for a
+        length it had no time to find), or None.
     """
+    PONDER_MILLIS = 10000.
+    BATCH_MIN_MOVES = 16
+    ENDGAME_CACHE_ENTRIES = 1 << 18
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 inplace=False, transposition_table=None,
+                 move_ordering="none", processes=1, parallel="root",
+                 ponder=None, batch_frontier=False, endgame=True,
+                 time_manager=None):
+        super().__init__(search_depth, score_fn, timeout)
+        self.batch_frontier = batch_frontier
+        self.time_manager = time_manager
+        self.inplace = inplace
+        self.tt = transposition_table
+        if isinstance(move_ordering, str):
+            move_ordering = MOVE_ORDERINGS[move_ordering]()
+        self.orderer = move_ordering
+        self.nodes = 0
+        self.depth_nodes = []
+        self.resolved = False
+        self._root_depth = 0
+        self._depth_cutoff = False
+
+        # Principal variation and root move scores of the last completed
+        # iterative deepening pass, and the line found below each ply
+        self._pv = []
+        self._root_scores = {}
+        self._pv_table = [[]]
+        self._best_score = None
+
+        # Worker pool of the parallel search and the best root score shared
+        # by the workers during the search identified by _search_id
+        self.processes = processes
+        self.parallel = parallel
+        self._pool = None
+        self._shared_alpha = None
+        self._shared_search = None
+        self._search_id = 0
+
+        # Worker process pondering the replies in _pondered, see _ponder()
+        self.ponder = ponder
+        self.ponder_hits = self.ponder_misses = 0
+        self._ponder_pool = None
+        self._ponder_search = None
+        self._pondered = ()
+
+        # Releases the workers and the shared table when the player is
+        # garbage collected or the interpreter exits, see start()
+        self._finalizer = None
+
+        # Longest paths found by the endgame solver, see `longest_path`, and
+        # the (width, height) of the board they were found on
+        self.endgame = endgame
+        self.endgame_lengths = None
+        self._endgame_cache = {}
+        self._endgame_size = None
+
+    def __getstate__(self):
+        # worker pools and shared values belong to the process that made them
+        state = self.__dict__.copy()
+        state.update(_pool=None, _shared_alpha=None, _shared_search=None,
+                     _ponder_pool=None, _ponder_search=None, _finalizer=None)
+        return state
+
+    def start(self):
+        """Start the worker processes of the parallel search and of
+        pondering, so that the startup cost is not charged to the first move.
+
+        The workers and the shared transposition table are released by
+        close(), or else when the player is garbage collected or the
+        interpreter exits.
+        """
+        if ((self.ponder or self.parallel == "lazy_smp" and
+                self.processes > 1) and
+                not isinstance(self.tt, SharedTranspositionTable)):
+            table = self.tt or TranspositionTable()
+            self.tt = SharedTranspositionTable(
+                max_entries=table.size, policy=table.policy)
+        # the workers get a copy of the player, as a pool referring to the
+        # player would keep it alive and its finalizer from ever running
+        worker = copy.copy(self)
+        if self.ponder and self._ponder_pool is None:
+            self._ponder_search = multiprocessing.Value("l", 0, lock=False)
+            self._ponder_pool = multiprocessing.Pool(
+                1, _init_search_worker, (worker, None, self._ponder_search))
+        if self.processes > 1 and self._pool is None:
+            workers = self.processes
+            if self.parallel == "lazy_smp":
+                workers -= 1
+            self._shared_alpha = multiprocessing.Value("d", float("-inf"))
+            self._shared_search = multiprocessing.Value("l", 0, lock=False)
+            self._pool = multiprocessing.Pool(
+                workers, _init_search_worker,
+                (worker, self._shared_alpha, self._shared_search))
+
+        shared_tt = self.tt if isinstance(
+            self.tt, SharedTranspositionTable) else None
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        if self._ponder_pool or self._pool or shared_tt:
+            self._finalizer = weakref.finalize(
+                self, _release_workers, (self._ponder_pool, self._pool),
+                shared_tt)
+
+    def close(self):
+        """Stop the worker processes of the parallel search and of
+        pondering, and release the shared transposition table. The player
+        can still be used: the workers are started again when needed.
+        """
+        self._pondered = ()
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._ponder_pool = self._pool = None
+        self._ponder_search = self._shared_alpha = self._shared_search = None
+        if isinstance(self.tt, SharedTranspositionTable):
+            self.tt.close()
+            self.tt = TranspositionTable(max_entries=self.tt.size,
+                                         policy=self.tt.policy)
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -441,17 +1748,138 @@ class AlphaBetaPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
 
+        pondered_move = self._stop_pondering(game)
+        self.endgame_lengths = None
+        self.depth_nodes = []
+        if not game.get_legal_moves():
+            # the game is lost: nothing to search or ponder
+            return (-1, -1)
+        if self.endgame:
+            best_move = self._solve_endgame(game, time_left)
+            if best_move is not None:
+                return best_move
+
+        if isinstance(self.score, EvalCache):
+            self.score.new_search(game)
+        lazy_smp = self.processes > 1 and self.parallel == "lazy_smp"
+        if self.processes > 1 and not lazy_smp:
+            best_move = self._get_move_parallel(game, time_left)
+        else:
+            best_move = self._iterative_deepening(game, time_left, lazy_smp)
+
+        if best_move == (-1, -1) and pondered_move is not None:
+            best_move = pondered_move
+        if self.ponder:
+            self._start_pondering(game, best_move)
+        return best_move
+
+    def _solve_endgame(self, game, time_left):
+        """Return the move starting the longest path in the own region if
+        the players are in separate regions of `game`, or None to search.
+
+        The winner of a partitioned game is known as soon as both longest
+        paths are: the player to move wins if its path is strictly longer.
+        """
+        try:
+            from isolation.bitboard import board_geometry
+            from isolation.endgame import longest_path, partition
+        except ImportError:
+            # without the solver modules, every move is searched
+            return None
+        self.time_left = time_left
+        part = partition(game)
+        if part is None:
+            return None
+        masks, cells = board_geometry(game.width, game.height)
+        moves = []
+        mask = masks[part.own_location] & part.own_region
+        while mask:
+            low = mask & -mask
+            moves.append(low.bit_length() - 1)
+            mask ^= low
+        if not moves:
+            return None
+
+        def check():
+            if self.time_left() < self.TIMER_THRESHOLD:
+                raise SearchTimeout()
+
+        # cache entries only hold for the board size they were found on
+        if (len(self._endgame_cache) > self.ENDGAME_CACHE_ENTRIES or
+                self._endgame_size != (game.width, game.height)):
+            self._endgame_cache.clear()
+            self._endgame_size = (game.width, game.height)
+        # try the moves with the fewest onward moves first (Warnsdorff's
+        # rule), which usually start the longest paths, but dead ends last
+        onward = {m: bin(masks[m] & part.own_region).count("1")
+                  for m in moves}
+        moves.sort(key=lambda m: (not onward[m], onward[m]))
+        region_size = bin(part.own_region).count("1")
+        best_move, own_length, opp_length = moves[0], None, None
+        try:
+            for m in moves:
+                length = 1 + longest_path(
+                    masks, part.own_region & ~(1 << m), m, check,
+                    self._endgame_cache)
+                if own_length is None or length > own_length:
+                    best_move, own_length = m, length
+                if own_length == region_size:
+                    break
+            opp_length = longest_path(
+                masks, part.opp_region, part.opp_location, check,
+                self._endgame_cache)
+        except SearchTimeout:
+            pass
+
+        self.endgame_lengths = (own_length, opp_length)
+        self._pv = []
+        self._best_score = None
+        if own_length is not None and opp_length is not None:
+            self._best_score = (float("inf") if own_length > opp_length
+                                else float("-inf"))
+        return cells[best_move]
+
+    def _iterative_deepening(self, game, time_left, lazy_smp):
+        """Iterative deepening search in this process, helped by the Lazy SMP
+        helpers if `lazy_smp` is True; see get_move() for the parameters.
+        """
+        manager = self.time_manager
+        if manager is not None:
+            time_left = manager.new_move(time_left)
         self.time_left = time_left
+        if lazy_smp or self.ponder:
+            self.start()
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self._pv = []
+        self._root_scores = {}
+        self.depth_nodes = []
+        if lazy_smp:
+            self._start_helpers(game)
 
         best_move = (-1, -1)
         search_depth = 1
         while True:
             try:
                 best_move = self.alphabeta(game, search_depth)
-                search_depth += 1
+                self.depth_nodes.append((search_depth, self.nodes))
             except SearchTimeout:
+                if manager is not None:
+                    manager.abandon()
                 break
+            if manager is not None:
+                manager.record(search_depth, self.nodes)
+            if self.resolved:
+                break
+            if manager is not None and not manager.can_finish(
+                    self.time_left() - self.TIMER_THRESHOLD):
+                break
+            search_depth += 1
 
+        if lazy_smp:
+            self._shared_search.value = 0
         return best_move
 
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
@@ -505,9 +1933,177 @@ class AlphaBetaPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
-        return self._evaluate_alphabeta(game, depth, alpha, beta)[1]
+        self._prepare_search(depth)
+        root_scores = dict(self._root_scores)
+        self._best_score, move = self._evaluate_alphabeta(
+            game, depth, alpha, beta, on_pv=True, root_scores=root_scores)
+        self.resolved = (not self._depth_cutoff or
+                         abs(self._best_score) == float("inf"))
+
+        # order the next pass after the line and move scores found by this one
+        self._pv = self._pv_table[0]
+        self._root_scores = root_scores
+        return move
+
+    def _get_move_parallel(self, game, time_left):
+        """Iterative deepening search with the root moves of every pass split
+        across the worker pool; see get_move() for the parameters.
+        """
+        manager = self.time_manager
+        if manager is not None:
+            time_left = manager.new_move(time_left)
+        # the nodes of the workers are charged to a node limited budget
+        charge = getattr(time_left, "charge", None)
+        self.time_left = time_left
+        self.start()
+        self.depth_nodes = []
+        self.resolved = False
+        board = _with_players(game, {self: _SELF,
+                                     game.get_opponent(self): _OPPONENT})
+        moves = game.get_legal_moves()
+        root_scores = {}
 
-    def _evaluate_alphabeta(self, game, depth, alpha, beta, maximize=True):
+        best_move = (-1, -1)
+        search_depth = 1
+        while moves:
+            remaining = self.time_left() - self.TIMER_THRESHOLD
+            if remaining <= 0:
+                break
+            deadline = _deadline(remaining)
+            self._search_id += 1
+            with self._shared_alpha.get_lock():
+                self._shared_alpha.value = float("-inf")
+                self._shared_search.value = self._search_id
+
+            # search the best move of the previous pass first; the younger
+            # brothers wait for its score to bound their own searches
+            moves.sort(key=lambda m: root_scores.get(m, float("-inf")),
+                       reverse=True)
+            tasks = [(board, m, search_depth, deadline, self._search_id)
+                     for m in moves]
+            results = []
+            try:
+                results.append(self._pool.apply_async(
+                    _search_root_move, (tasks[0],)).get(
+                        _seconds_to(deadline)))
+                pending = self._pool.imap_unordered(
+                    _search_root_move, tasks[1:])
+                for _ in tasks[1:]:
+                    results.append(pending.next(_seconds_to(deadline)))
+            except multiprocessing.TimeoutError:
+                if manager is not None:
+                    manager.abandon()
+                break
+            if any(score is None for _, score, _, _ in results):
+                if manager is not None:
+                    manager.abandon()
+                break
+
+            root_scores = {move: score for move, score, _, _ in results}
+            best_move = max(moves, key=lambda m: root_scores[m])
+            self.depth_nodes.append(
+                (search_depth, sum(nodes for _, _, nodes, _ in results)))
+            if charge is not None:
+                charge(self.depth_nodes[-1][1])
+            self._best_score = root_scores[best_move]
+            self.resolved = (not any(cutoff for _, _, _, cutoff in results) or
+                             abs(self._best_score) == float("inf"))
+            if manager is not None:
+                manager.record(search_depth, self.depth_nodes[-1][1])
+            if self.resolved:
+                break
+            if manager is not None and not manager.can_finish(
+                    self.time_left() - self.TIMER_THRESHOLD):
+                break
+            search_depth += 1
+
+        # stop the searches of an abandoned pass
+        self._shared_search.value = 0
+        return best_move
+
+    def _start_pondering(self, game, move):
+        """Start pondering the opponent replies to `move` in the position
+        `game`, until the next call to get_move().
+        """
+        board = game.forecast_move(move)
+        replies = board.get_legal_moves()
+        if move == (-1, -1) or not replies:
+            self._pondered = ()
+            return
+        if (self.ponder == "predicted" and len(self._pv) > 1 and
+                self._pv[0] == move and self._pv[1] in replies):
+            replies = [self._pv[1]]
+
+        self.start()
+        deadline = timeit.default_timer() + self.PONDER_MILLIS / 1000.
+        self._search_id += 1
+        self._ponder_search.value = self._search_id
+        self._pondered = replies
+        board = _with_players(board, {self: _SELF,
+                                      game.get_opponent(self): _OPPONENT})
+        self._ponder_pool.apply_async(_ponder, ((
+            board, replies, deadline, self._search_id, self.tt.generation),))
+
+    def _stop_pondering(self, game):
+        """Stop pondering, and return the best move stored in the
+        transposition table for `game` if the opponent reply was pondered.
+        """
+        if not self._pondered:
+            return None
+        self._ponder_search.value = 0
+        reply = game.get_player_location(game.get_opponent(self))
+        pondered, self._pondered = self._pondered, ()
+        if reply not in pondered:
+            self.ponder_misses += 1
+            return None
+        self.ponder_hits += 1
+        entry = self.tt.probe(game.hash())
+        if entry is not None and entry[4] in game.get_legal_moves():
+            return entry[4]
+        return None
+
+    def _start_helpers(self, game):
+        """Start the Lazy SMP helpers on the position `game` until the
+        current move deadline, or until the shared search id is reset.
+        """
+        deadline = _deadline(self.time_left() - self.TIMER_THRESHOLD)
+        self._search_id += 1
+        self._shared_search.value = self._search_id
+        board = _with_players(game, {self: _SELF,
+                                     game.get_opponent(self): _OPPONENT})
+        for helper in range(1, self.processes):
+            self._pool.apply_async(_lazy_smp_helper, ((
+                board, deadline, self._search_id, self.tt.generation,
+                helper),))
+
+    def _prepare_search(self, depth):
+        """Reset the per-search state before searching to `depth`."""
+        self._root_depth = depth
+        self.nodes = 0
+        self._depth_cutoff = False
+        self._pv_table = [[] for _ in range(depth + 1)]
+
+    def _order_moves(self, moves, ply, on_pv, tt_move, root_scores,
+                     maximize=True):
+        """Sort `moves` in place so that the most promising are searched first:
+        the principal variation move of the previous pass, then the stored
+        transposition table move, then the remaining moves by their score in
+        the previous pass at the root, or by the move orderer elsewhere.
+        """
+        if root_scores:
+            moves.sort(key=lambda m: root_scores.get(m, float("-inf")),
+                       reverse=True)
+        elif self.orderer is not None:
+            self.orderer.order(moves, ply, int(not maximize))
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        if on_pv and ply < len(self._pv) and self._pv[ply] in moves:
+            moves.remove(self._pv[ply])
+            moves.insert(0, self._pv[ply])
+
+    def _evaluate_alphabeta(self, game, depth, alpha, beta, maximize=True,
+                            on_pv=False, root_scores=None):
         """Evaluates node per alphabeta logic
 
         Parameters
@@ -526,6 +2122,17 @@ class AlphaBetaPlayer(IsolationPlayer):
         beta : float
             Beta limits the upper bound of search on maximizing layers
 
+        maximize : boolean
+            True if it's a maximize node. False otherwise.
+
+        on_pv : boolean
+            True if the node lies on the principal variation of the previous
+            iterative deepening pass.
+
+        root_scores : dict (optional)
+            Scores of the root moves in the previous pass, used to order them;
+            only given at the root, where it is refilled with the scores found.
+
         Returns
         -------
         tuple
@@ -534,43 +2141,407 @@ class AlphaBetaPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
+        self.nodes += 1
+        ply = self._root_depth - depth
+        tt_move = None
+        if self.tt is not None and depth > 0:
+            key = game.hash()
+            alpha_orig, beta_orig = alpha, beta
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_depth, tt_score, tt_flag, tt_move = entry[1:5]
+                if tt_depth >= depth and depth < self._root_depth:
+                    # reuse the stored result as a cutoff or narrower window;
+                    # it may come from a depth limited search
+                    if tt_flag == TranspositionTable.EXACT:
+                        self._pv_table[ply] = [tt_move]
+                        self._depth_cutoff = True
+                        return tt_score, tt_move
+                    if tt_flag == TranspositionTable.LOWER:
+                        alpha = max(alpha, tt_score)
+                    else:
+                        beta = min(beta, tt_score)
+                    if alpha >= beta:
+                        self._pv_table[ply] = [tt_move]
+                        self._depth_cutoff = True
+                        return tt_score, tt_move
+
+        self._pv_table[ply] = []
         moves = game.get_legal_moves()
         if not moves:
             return game.utility(self), (-1, -1)
 
         if depth == 0:
+            self._depth_cutoff = True
             return self.score(game, self), (-1, -1)
 
-        best_move = (-1, -1)
+        self._order_moves(moves, ply, on_pv, tt_move, root_scores, maximize)
+        pv_move = self._pv[ply] if on_pv and ply < len(self._pv) else None
+        if root_scores is not None:
+            root_scores.clear()
+
+        # score all the children at the search horizon at once
+        leaf_scores = None
+        if (depth == 1 and self.batch_frontier and
+                len(moves) >= self.BATCH_MIN_MOVES and
+                hasattr(self.score, "batch")):
+            leaf_scores = dict(zip(moves, self.score.batch(game, moves, self)))
+            self.nodes += len(moves)
+            self._depth_cutoff = True
+            self._pv_table[ply + 1] = []
+
+        # a lost node still returns a legal move, so that a proven loss at
+        # the root plays on instead of forfeiting
+        best_move = moves[0]
         if maximize:
             # maximize
             best_score = float("-inf")
             for m in moves:
-                forecast = game.forecast_move(m)
-                score, _ = self._evaluate_alphabeta(
-                    forecast, depth - 1, alpha, beta, False)
+                if leaf_scores is not None:
+                    score = leaf_scores[m]
+                else:
+                    forecast = _make_move(game, m, self.inplace)
+                    try:
+                        score, _ = self._evaluate_alphabeta(
+                            forecast, depth - 1, alpha, beta, False,
+                            on_pv=m == pv_move)
+                    finally:
+                        _unmake_move(game, self.inplace)
+                if root_scores is not None:
+                    root_scores[m] = score
                 if score > best_score:
                     best_score, best_move = score, m
+                    self._pv_table[ply] = [m] + self._pv_table[ply + 1]
                 if best_score >= beta:
                     # prune if applicable
+                    if self.orderer is not None:
+                        self.orderer.cutoff(m, ply, 0, depth)
                     break
                 alpha = max(alpha, best_score)
         else:
             # minimize
             best_score = float("inf")
             for m in moves:
-                forecast = game.forecast_move(m)
-                score, _ = self._evaluate_alphabeta(
-                    forecast, depth - 1, alpha, beta, True)
+                if leaf_scores is not None:
+                    score = leaf_scores[m]
+                else:
+                    forecast = _make_move(game, m, self.inplace)
+                    try:
+                        score, _ = self._evaluate_alphabeta(
+                            forecast, depth - 1, alpha, beta, True,
+                            on_pv=m == pv_move)
+                    finally:
+                        _unmake_move(game, self.inplace)
                 if score < best_score:
                     best_score, best_move = score, m
+                    self._pv_table[ply] = [m] + self._pv_table[ply + 1]
                 if best_score <= alpha:
                     # prune if applicable
+                    if self.orderer is not None:
+                        self.orderer.cutoff(m, ply, 1, depth)
                     break
                 beta = min(beta, best_score)
+
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                flag = TranspositionTable.UPPER
+            elif best_score >= beta_orig:
+                flag = TranspositionTable.LOWER
+            else:
+                flag = TranspositionTable.EXACT
+            self.tt.store(key, depth, best_score, flag, best_move)
         return best_score, best_move
 
 
+class MCTSNode:
+    """Node of the search tree of `MCTSPlayer`.
+
+    Nodes only store what the search needs: the move leading to the node, the
+    statistics of the playouts that went through it and the moves below it.
+    The board state of a node is rebuilt by applying the moves on the path
+    from the root, and the `__slots__` keep each node to a few dozen bytes.
+
+    Parameters
+    ----------
+    move : int or None
+        The cell index of the move leading to the node (None at the root of
+        a new tree).
+
+    mover : int
+        The player who made `move`: 0 for player 1, 1 for player 2.
+
+    untried : list<int>
+        The cell indices of the legal moves from the node, in random order.
+    """
+    __slots__ = ("move", "mover", "visits", "wins", "children", "untried")
+
+    def __init__(self, move, mover, untried):
+        self.move = move
+        self.mover = mover
+        self.visits = 0
+        self.wins = 0
+        self.children = []
+        self.untried = untried
+
+
+class MCTSPlayer(IsolationPlayer):
+    """Game-playing agent that chooses a move using Monte Carlo tree search
+    with the UCT selection rule: every iteration walks down the tree picking
+    the child with the best upper confidence bound, adds one child, plays the
+    game to the end with `isolation.playout.simulate` and counts the result
+    in every node on the path. The most visited root move is returned.
+
+    Parameters
+    ----------
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is aborted.
+
+    exploration : float (optional)
+        The exploration constant of the UCT rule; larger values spread the
+        playouts more evenly across the moves.
+
+    policy : str (optional)
+        The playout policy, one of `isolation.playout.POLICIES`.
+
+    reuse_tree : bool (optional)
+        If True, keep the subtree under the move returned by get_move() and
+        continue the next search from the node of the opponent reply, instead
+        of starting from an empty tree.
+
+    seed : int (optional)
+        Seed of the random generator of the search, for reproducible games.
+
+    Attributes
+    ----------
+    iterations : int
+        The number of iterations (i.e., playouts) run by the last call to
+        get_move().
+
+    iterations_per_second : float
+        The iteration throughput of the last call to get_move().
+
+    reused_visits : int
+        The number of visits of the root kept from the previous turn by the
+        last call to get_move().
+    """
+
+    # Milliseconds kept, on top of the timer threshold, for returning the move
+    # after the last iteration
+    TEARDOWN_MILLIS = 1.
+
+    def __init__(self, timeout=10., exploration=math.sqrt(2),
+                 policy="random", reuse_tree=True, seed=None):
+        from isolation.playout import POLICIES
+        super().__init__(timeout=timeout)
+        if policy not in POLICIES:
+            raise ValueError("Unknown playout policy: {}".format(policy))
+        self.exploration = exploration
+        self.policy = policy
+        self.reuse_tree = reuse_tree
+        self.iterations = 0
+        self.iterations_per_second = 0.
+        self.reused_visits = 0
+        self._rng = random.Random(seed)
+
+        # Tree kept between turns and the state at its root as (width,
+        # height, blocked, locations, turn), see `board_to_state`, and the
+        # root of the last search, freed by the next one
+        self._root = None
+        self._root_state = None
+        self._discarded = None
+
+    def start(self):
+        """Nothing to start: the search runs in this process. Present for
+        compatibility with `AlphaBetaPlayer`.
+        """
+
+    def close(self):
+        """Discard the tree kept between turns."""
+        self._root = self._root_state = self._discarded = None
+
+    def tree_memory(self):
+        """Return the size of the tree kept between turns.
+
+        Returns
+        -------
+        (int, int)
+            The number of nodes and their approximate memory use in bytes
+            (the nodes and their lists, not the shared small integers).
+        """
+        nodes = size = 0
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            size += (sys.getsizeof(node) + sys.getsizeof(node.children) +
+                     sys.getsizeof(node.untried))
+            stack.extend(node.children)
+        return nodes, size
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        from isolation.bitboard import board_geometry
+        from isolation.playout import board_to_state
+        self.time_left = time_left
+        start = timeit.default_timer()
+        state = board_to_state(game)
+        width, height, blocked, locations, turn = state
+        masks, cells = board_geometry(width, height)
+        full = (1 << (width * height)) - 1
+
+        root = self._find_subtree(state) if self.reuse_tree else None
+        # free the rest of the old trees now rather than after the search,
+        # where the time it takes would not be accounted for
+        self._root = self._root_state = self._discarded = None
+        if root is None:
+            root = MCTSNode(None, turn ^ 1, self._untried_moves(
+                masks, full, blocked, locations[turn]))
+        self.reused_visits = root.visits
+
+        # stop while there is still time for the slowest iteration so far
+        # and for returning the move
+        self.iterations = 0
+        margin = self.TIMER_THRESHOLD + self.TEARDOWN_MILLIS
+        slowest = 0.
+        while self.time_left() - slowest >= margin:
+            iteration_start = timeit.default_timer()
+            self._iterate(root, masks, full, blocked, locations, turn)
+            self.iterations += 1
+            slowest = max(slowest, 1000 * (timeit.default_timer() -
+                                           iteration_start))
+        seconds = timeit.default_timer() - start
+        self.iterations_per_second = (self.iterations / seconds if seconds
+                                      else float("inf"))
+
+        if root.children:
+            best = max(root.children, key=lambda child: child.visits)
+            move = best.move
+        elif root.untried:
+            best, move = None, root.untried[0]
+        else:
+            self._root = self._root_state = None
+            return (-1, -1)
+
+        # keep the subtree under the move played, with the state it reaches;
+        # the other moves are freed by the next search
+        next_locations = list(locations)
+        next_locations[turn] = move
+        self._root = best
+        self._discarded = root
+        self._root_state = (width, height, blocked | 1 << move,
+                            tuple(next_locations), turn ^ 1)
+        return cells[move]
+
+    def _untried_moves(self, masks, full, blocked, location):
+        """Return the cell indices of the legal moves of a player at
+        `location` (None if not placed), in random order.
+        """
+        moves = full & ~blocked
+        if location is not None:
+            moves &= masks[location]
+        untried = []
+        while moves:
+            low = moves & -moves
+            untried.append(low.bit_length() - 1)
+            moves ^= low
+        self._rng.shuffle(untried)
+        return untried
+
+    def _find_subtree(self, state):
+        """Return the node of the kept tree for `state`, reached by the moves
+        played since the last search, or None if it was not expanded.
+        """
+        if self._root is None:
+            return None
+        node = self._root
+        width, height, blocked, locations, turn = self._root_state
+        if (width, height) != state[:2]:
+            return None
+        locations = list(locations)
+        new_locations = state[3]
+        while blocked != state[2]:
+            if blocked & ~state[2]:
+                return None
+            move = new_locations[turn]
+            if move is None or blocked >> move & 1:
+                return None
+            for child in node.children:
+                if child.move == move:
+                    node = child
+                    break
+            else:
+                return None
+            blocked |= 1 << move
+            locations[turn] = move
+            turn ^= 1
+        if tuple(locations) != tuple(new_locations) or turn != state[4]:
+            return None
+        return node
+
+    def _iterate(self, root, masks, full, blocked, locations, turn):
+        """Run one selection, expansion, playout and backpropagation step
+        from `root`, whose state is (blocked, locations, turn).
+        """
+        from isolation.playout import simulate
+        log = math.log
+        sqrt = math.sqrt
+        exploration = self.exploration
+        locations = list(locations)
+        node = root
+        path = [root]
+
+        # selection
+        while not node.untried and node.children:
+            factor = exploration * sqrt(log(node.visits))
+            best_value = -1.
+            for child in node.children:
+                value = (child.wins / child.visits +
+                         factor / sqrt(child.visits))
+                if value > best_value:
+                    best_value, node = value, child
+            blocked |= 1 << node.move
+            locations[turn] = node.move
+            turn ^= 1
+            path.append(node)
+
+        # expansion
+        if node.untried:
+            move = node.untried.pop()
+            blocked |= 1 << move
+            locations[turn] = move
+            child = MCTSNode(move, turn, self._untried_moves(
+                masks, full, blocked, locations[turn ^ 1]))
+            node.children.append(child)
+            turn ^= 1
+            path.append(child)
+
+        winner = simulate(masks, full, blocked, locations, turn, self.policy,
+                          self._rng)
+        for node in path:
+            node.visits += 1
+            if node.mover == winner:
+                node.wins += 1
+
+
 def debug(depth, key, value):
     """
     To help with debugging.
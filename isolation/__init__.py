@@ -8,4 +8,12 @@ legal moves loses, and the opponent is declared the winner.
 """
 
 # Make the Board class available at the root of the module for imports
-from .isolation import Board
+from .isolation import Board, Features
+from .bitboard import BitBoard
+from .budget import SearchBudget
+
+# BoardBatch requires NumPy, which is optional
+try:
+    from .batch import BoardBatch
+except ImportError:
+    pass
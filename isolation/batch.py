@@ -0,0 +1,281 @@
+"""
+This file contains the `BoardBatch` class, which holds many games of
+Isolation in NumPy arrays so they can be stepped through together, e.g., to
+run thousands of random or greedy playouts at once.
+
+Cells use the same index as `Board` (`row + column * height`). Each board is
+a row of the arrays: a bitplane of blocked cells, the cell index of each
+player's location (-1 until placed) and the player with the initiative.
+This module requires NumPy.
+"""
+import numpy
+
+from .bitboard import board_geometry
+from .isolation import Board
+
+_ADJACENCY = {}
+
+
+def knight_adjacency(width, height):
+    """Return the knight-move adjacency matrix of a board of the given size.
+
+    The matrix is built on first use and shared by every caller with the same
+    dimensions; it must not be modified.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (cells + 1, cells) boolean array whose row `i` flags the cells a
+        knight reaches from cell `i`. The extra last row flags every cell,
+        for players that have not been placed yet (location -1).
+    """
+    adjacency = _ADJACENCY.get((width, height))
+    if adjacency is None:
+        masks, _ = board_geometry(width, height)
+        cells = width * height
+        adjacency = numpy.ones((cells + 1, cells), dtype=bool)
+        for idx, mask in enumerate(masks):
+            adjacency[idx] = [mask >> cell & 1 for cell in range(cells)]
+        adjacency.flags.writeable = False
+        _ADJACENCY[(width, height)] = adjacency
+    return adjacency
+
+
+class BoardBatch(object):
+    """Implement a batch of `n` Isolation games stored in NumPy arrays.
+
+    Parameters
+    ----------
+    n : int
+        The number of games in the batch, all starting from an empty board.
+
+    width : int (optional)
+        The number of columns of every board.
+
+    height : int (optional)
+        The number of rows of every board.
+
+    Attributes
+    ----------
+    blocked : numpy.ndarray
+        (n, width * height) boolean array of the blocked cells of each game.
+
+    locations : numpy.ndarray
+        (n, 2) integer array of the cell index of the location of player 1
+        and player 2 in each game, or -1 if the player has not moved.
+
+    turn : numpy.ndarray
+        (n,) integer array of the player with the initiative in each game
+        (0 for player 1, 1 for player 2).
+
+    move_count : numpy.ndarray
+        (n,) integer array of the number of moves applied to each game.
+    """
+
+    def __init__(self, n, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.blocked = numpy.zeros((n, width * height), dtype=bool)
+        self.locations = numpy.full((n, 2), -1, dtype=numpy.intp)
+        self.turn = numpy.zeros(n, dtype=numpy.intp)
+        self.move_count = numpy.zeros(n, dtype=numpy.intp)
+        self._adjacency = knight_adjacency(width, height)
+        self._onward = self._adjacency[:-1].T.astype(numpy.float32)
+        self._rows = numpy.arange(n)
+
+    def __len__(self):
+        return len(self.turn)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """Return a batch holding the game states of a list of objects
+        implementing the `isolation.Board` API, which must all have the same
+        dimensions.
+        """
+        width, height = boards[0].width, boards[0].height
+        batch = cls(len(boards), width, height)
+        batch.blocked[:] = True
+        for i, board in enumerate(boards):
+            if (board.width, board.height) != (width, height):
+                raise ValueError("All boards of a batch must have the same "
+                                 "dimensions")
+            for r, c in board.get_blank_spaces():
+                batch.blocked[i, r + c * height] = False
+            for p, player in enumerate((board._player_1, board._player_2)):
+                loc = board.get_player_location(player)
+                if loc is not Board.NOT_MOVED:
+                    batch.locations[i, p] = loc[0] + loc[1] * height
+            batch.turn[i] = int(board.active_player != board._player_1)
+            batch.move_count[i] = board.move_count
+        return batch
+
+    def to_board(self, i, player_1, player_2, board_cls=Board):
+        """Return game `i` of the batch as a new board registered with the
+        given players.
+
+        Parameters
+        ----------
+        i : int
+            The index of the game in the batch.
+
+        player_1, player_2 : object
+            The players of the board.
+
+        board_cls : class (optional)
+            `isolation.Board` or `isolation.BitBoard`.
+
+        Returns
+        -------
+        isolation.Board
+            A board in the state of game `i`.
+        """
+        board = Board(player_1, player_2, self.width, self.height)
+        state = board._board_state
+        for idx in numpy.flatnonzero(self.blocked[i]):
+            state[idx] = 1
+        for p in range(2):
+            if self.locations[i, p] >= 0:
+                state[-1 - p] = int(self.locations[i, p])
+        state[-3] = int(self.turn[i])
+        if self.turn[i]:
+            board._active_player, board._inactive_player = player_2, player_1
+        board.move_count = int(self.move_count[i])
+        board._hash = board._compute_hash()
+        if board_cls is not Board:
+            board = board_cls.from_board(board)
+        return board
+
+    def to_boards(self, player_1, player_2, board_cls=Board):
+        """Return every game of the batch as a list of boards; see
+        to_board().
+        """
+        return [self.to_board(i, player_1, player_2, board_cls)
+                for i in range(len(self))]
+
+    def copy(self):
+        """ Return a deep copy of the batch. """
+        new_batch = self.__class__.__new__(self.__class__)
+        new_batch.__dict__.update(self.__dict__)
+        for name in ("blocked", "locations", "turn", "move_count"):
+            setattr(new_batch, name, getattr(self, name).copy())
+        return new_batch
+
+    def legal_moves_mask(self, player=None):
+        """Return the legal moves of a player in every game.
+
+        Parameters
+        ----------
+        player : int or numpy.ndarray (optional)
+            The player (0 or 1) in every game, or one per game; the player
+            with the initiative by default.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n, width * height) boolean array flagging the cells each player
+            can move to.
+        """
+        if player is None:
+            player = self.turn
+        loc = self.locations[self._rows, player]
+        return self._adjacency[loc] & ~self.blocked
+
+    def mobility(self, player=None):
+        """Return the number of legal moves of a player in every game; see
+        legal_moves_mask().
+        """
+        return self.legal_moves_mask(player).sum(axis=1)
+
+    def is_terminal(self):
+        """Return a boolean array telling which games are over, i.e., where
+        the player with the initiative has no legal move.
+        """
+        return ~self.legal_moves_mask().any(axis=1)
+
+    def winners(self):
+        """Return an integer array of the winner of every game (0 for player
+        1, 1 for player 2), or -1 for the games that are not over.
+        """
+        return numpy.where(self.is_terminal(), self.turn ^ 1, -1)
+
+    def apply_moves(self, moves):
+        """Move the player with the initiative in every game.
+
+        Parameters
+        ----------
+        moves : numpy.ndarray
+            (n,) integer array of the cell index to move to in each game, or
+            -1 to leave a game unchanged. Moves are assumed to be legal.
+        """
+        rows = self._rows[moves >= 0]
+        cells = moves[rows]
+        turn = self.turn[rows]
+        self.blocked[rows, cells] = True
+        self.locations[rows, turn] = cells
+        self.turn[rows] = turn ^ 1
+        self.move_count[rows] += 1
+
+    def random_moves(self, rng=None):
+        """Return a uniformly random legal move (cell index) for the player
+        with the initiative in every game, or -1 for the games that are over.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator (optional)
+            The random generator to draw the moves from.
+        """
+        if rng is None:
+            rng = numpy.random.default_rng()
+        legal = self.legal_moves_mask()
+        keys = rng.random(legal.shape)
+        keys[~legal] = -1.
+        moves = keys.argmax(axis=1)
+        moves[~legal.any(axis=1)] = -1
+        return moves
+
+    def greedy_moves(self, rng=None):
+        """Return the legal move leaving the player with the initiative with
+        the most legal moves (ties broken at random) in every game, or -1 for
+        the games that are over; see random_moves().
+        """
+        if rng is None:
+            rng = numpy.random.default_rng()
+        legal = self.legal_moves_mask()
+        # the number of free cells a knight reaches from each cell
+        onward = (~self.blocked).astype(numpy.float32) @ self._onward
+        keys = onward + rng.random(legal.shape, dtype=numpy.float32)
+        keys[~legal] = -1.
+        moves = keys.argmax(axis=1)
+        moves[~legal.any(axis=1)] = -1
+        return moves
+
+    def playout(self, policy="random", rng=None):
+        """Play every game to the end in place, both players following
+        `policy`, and return the winners; see winners().
+
+        Parameters
+        ----------
+        policy : str (optional)
+            'random' or 'greedy', see random_moves() and greedy_moves().
+
+        rng : numpy.random.Generator (optional)
+            The random generator to draw the moves from.
+        """
+        if policy not in ("random", "greedy"):
+            raise ValueError("Unknown playout policy: {}".format(policy))
+        if rng is None:
+            rng = numpy.random.default_rng()
+        choose = self.random_moves if policy == "random" else self.greedy_moves
+        while True:
+            moves = choose(rng)
+            if (moves < 0).all():
+                return self.winners()
+            self.apply_moves(moves)
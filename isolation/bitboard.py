@@ -0,0 +1,372 @@
+"""
+This file contains the `BitBoard` class, an alternative engine for the game
+Isolation that is drop-in compatible with `isolation.Board`.
+
+Blocked cells are stored as the bits of a single integer, using the same cell
+index as `Board` (`row + column * height`), and knight moves are looked up in
+per-cell masks that are computed once for each (width, height) pair. Move
+generation, move application and copying are therefore a handful of integer
+operations instead of loops over Python lists.
+"""
+import random
+
+from .isolation import Board, DIRECTIONS, Features
+from .zobrist import zobrist_keys, zobrist_hash
+
+_GEOMETRY = {}
+
+
+def board_geometry(width, height):
+    """Return the precomputed lookup tables for a board of the given size.
+
+    The tables are built on first use and shared by every board with the same
+    dimensions.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    Returns
+    -------
+    (tuple<int>, tuple<(int, int)>)
+        The knight-move mask of every cell, and the (row, column) coordinate
+        pair of every cell, both indexed by cell index.
+    """
+    geometry = _GEOMETRY.get((width, height))
+    if geometry is None:
+        cells = tuple((idx % height, idx // height)
+                      for idx in range(width * height))
+        masks = []
+        for r, c in cells:
+            mask = 0
+            for dr, dc in DIRECTIONS:
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    mask |= 1 << (r + dr + (c + dc) * height)
+            masks.append(mask)
+        geometry = _GEOMETRY[(width, height)] = (tuple(masks), cells)
+    return geometry
+
+
+def mask_to_moves(mask, cells):
+    """Return the coordinate pairs of the set bits of `mask` in increasing
+    cell index order.
+    """
+    moves = []
+    while mask:
+        low = mask & -mask
+        moves.append(cells[low.bit_length() - 1])
+        mask ^= low
+    return moves
+
+
+class BitBoard(Board):
+    """Implement the `isolation.Board` API on top of an integer bitmask of
+    blocked cells and precomputed knight-move masks.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+    """
+
+    def __init__(self, player_1, player_2, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+
+        # Initiative (0 for player 1, 1 for player 2), the cell index of each
+        # player's location (None until placed) and the blocked cell bits
+        self._turn = 0
+        self._locations = [Board.NOT_MOVED, Board.NOT_MOVED]
+        self._blocked = 0
+        self._full = (1 << (width * height)) - 1
+        self._masks, self._cells = board_geometry(width, height)
+
+        # Moves applied with push_move(), see `isolation.Board.push_move`
+        self._undo_stack = []
+
+        # Zobrist key of the current state, see `isolation.Board.hash`
+        self._zobrist = zobrist_keys(width, height)
+        self._hash = 0
+
+    @classmethod
+    def from_board(cls, board):
+        """Return a `BitBoard` holding the same game state as any object
+        implementing the `isolation.Board` API.
+        """
+        new_board = cls(board._player_1, board._player_2,
+                        width=board.width, height=board.height)
+        new_board._blocked = new_board._full
+        for r, c in board.get_blank_spaces():
+            new_board._blocked ^= 1 << (r + c * board.height)
+        for i, player in enumerate((board._player_1, board._player_2)):
+            loc = board.get_player_location(player)
+            if loc is not Board.NOT_MOVED:
+                new_board._locations[i] = loc[0] + loc[1] * board.height
+        new_board.move_count = board.move_count
+        new_board._active_player = board.active_player
+        new_board._inactive_player = board.inactive_player
+        new_board._turn = int(board.active_player != board._player_1)
+        new_board._hash = new_board._compute_hash()
+        return new_board
+
+    def __getstate__(self):
+        # the lookup tables are shared per board size and rebuilt on load
+        state = self.__dict__.copy()
+        for name in ("_zobrist", "_masks", "_cells"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._zobrist = zobrist_keys(self.width, self.height)
+        self._masks, self._cells = board_geometry(self.width, self.height)
+
+    def _compute_hash(self):
+        """Compute the Zobrist key of the current state from scratch."""
+        return zobrist_hash(
+            self.width, self.height,
+            [idx for idx in range(self.width * self.height)
+             if self._blocked >> idx & 1],
+            self._locations, self._turn)
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = self.__class__.__new__(self.__class__)
+        new_board.__dict__.update(self.__dict__)
+        new_board._locations = self._locations[:]
+        new_board._undo_stack = []
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not self._blocked >> (move[0] + move[1] * self.height) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        return mask_to_moves(self._full & ~self._blocked, self._cells)
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        if player == self._player_1:
+            idx = self._locations[0]
+        elif player == self._player_2:
+            idx = self._locations[1]
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        if idx is Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._cells[idx]
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None or player == self._active_player:
+            idx = self._locations[self._turn]
+        else:
+            idx = self._locations[self._turn ^ 1]
+            if player != self._inactive_player:
+                raise RuntimeError(
+                    "Invalid player in get_legal_moves: {}".format(player))
+        if idx is Board.NOT_MOVED:
+            return self.get_blank_spaces()
+        moves = mask_to_moves(self._masks[idx] & ~self._blocked, self._cells)
+        random.shuffle(moves)
+        return moves
+
+    def features(self, player):
+        """Extract the features of the current game state from the point of
+        view of the specified player; see `isolation.Board.features`.
+        """
+        if player == self._player_1:
+            own_idx, opp_idx = self._locations
+        elif player == self._player_2:
+            opp_idx, own_idx = self._locations
+        else:
+            raise RuntimeError(
+                "Invalid player in features: {}".format(player))
+        free = self._full & ~self._blocked
+        own_mask = free if own_idx is None else self._masks[own_idx] & free
+        opp_mask = free if opp_idx is None else self._masks[opp_idx] & free
+        is_active = player == self._active_player
+        return Features(
+            own_mask, opp_mask, bin(own_mask).count("1"),
+            bin(opp_mask).count("1"), bin(own_mask & opp_mask).count("1"),
+            not is_active and not opp_mask, is_active and not own_mask,
+            is_active, None if own_idx is None else self._cells[own_idx],
+            None if opp_idx is None else self._cells[opp_idx],
+            self._mask_to_moves)
+
+    def _mask_to_moves(self, mask):
+        """Return the coordinate pairs of the set bits of `mask`."""
+        return mask_to_moves(mask, self._cells)
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        self._hash ^= self._move_key(idx, self._turn,
+                                     self._locations[self._turn])
+        self._blocked |= 1 << idx
+        self._locations[self._turn] = idx
+        self._turn ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push_move(self, move):
+        """Move the active player to a specified location in-place, recording
+        the change so that it can be reverted by `pop_move()`.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        last_loc = self._locations[self._turn]
+        self._undo_stack.append((idx, last_loc))
+        self._hash ^= self._move_key(idx, self._turn, last_loc)
+        self._blocked |= 1 << idx
+        self._locations[self._turn] = idx
+        self._turn ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def pop_move(self):
+        """Revert the last move applied with `push_move()`.
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the reverted move.
+        """
+        idx, last_loc = self._undo_stack.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        self._turn ^= 1
+        self._locations[self._turn] = last_loc
+        self._blocked ^= 1 << idx
+        self._hash ^= self._move_key(idx, self._turn, last_loc)
+        return self._cells[idx]
+
+    def _active_has_moves(self):
+        """Return True if the active player has at least one legal move."""
+        idx = self._locations[self._turn]
+        if idx is Board.NOT_MOVED:
+            return self._blocked != self._full
+        return bool(self._masks[idx] & ~self._blocked)
+
+    def is_winner(self, player):
+        """ Test whether the specified player has won the game. """
+        return player == self._inactive_player and not self._active_has_moves()
+
+    def is_loser(self, player):
+        """ Test whether the specified player has lost the game. """
+        return player == self._active_player and not self._active_has_moves()
+
+    def utility(self, player):
+        """Returns the utility of the current game state from the perspective
+        of the specified player; see `isolation.Board.utility`.
+        """
+        if not self._active_has_moves():
+
+            if player == self._inactive_player:
+                return float("inf")
+
+            if player == self._active_player:
+                return float("-inf")
+
+        return 0.
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        p1_loc, p2_loc = self._locations
+
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if not self._blocked >> idx & 1:
+                    out += ' '
+                elif p1_loc == idx:
+                    out += symbols[0]
+                elif p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
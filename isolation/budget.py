@@ -0,0 +1,107 @@
+"""
+This file contains the `SearchBudget` class, a drop-in replacement for the
+`time_left` callback passed to `get_move()` that can limit a search on
+wall-clock time, on the number of nodes searched, or on both.
+
+Search agents check `time_left()` once at every node they visit and stop when
+it falls below their timer threshold, so a budget counts nodes by counting
+these checks and reports no time left once its node limit is spent. A node
+limited search visits the same nodes regardless of machine load (provided the
+`random` module is seeded, since `get_legal_moves()` shuffles its moves), which
+makes strength comparisons reproducible and independent from engine speed.
+Nodes searched by worker processes (parallel search, pondering) do not call the
+budget; the root-splitting parallel search of `AlphaBetaPlayer` charges them to
+the budget after every pass (see `SearchBudget.charge`), the others are not
+counted.
+
+The time limit is measured on one of the `CLOCKS`: wall-clock time by default,
+or the CPU time of the process or of the calling thread, which does not run
+while the process waits for a core. CPU clocks keep the time limits fair when
+many games share a host, but do not count the time of worker processes.
+"""
+import time
+import timeit
+
+CLOCKS = {"wall": timeit.default_timer, "process": time.process_time,
+          "thread": time.thread_time}
+
+
+class SearchBudget(object):
+    """Callable returning the number of milliseconds left in the current turn,
+    limited by time, nodes or both.
+
+    Parameters
+    ----------
+    time_limit : numeric (optional)
+        The number of milliseconds allowed for the turn, or None for no
+        wall-clock limit.
+
+    node_limit : int (optional)
+        The number of nodes (i.e., calls to the budget) allowed for the turn,
+        or None for no node limit.
+
+    clock : str (optional)
+        The clock measuring the time limit, one of `CLOCKS`: 'wall',
+        'process' (CPU time of the process) or 'thread' (CPU time of the
+        calling thread).
+
+    Attributes
+    ----------
+    nodes : int
+        The number of calls to the budget since the last call to start().
+    """
+
+    def __init__(self, time_limit=None, node_limit=None, clock="wall"):
+        if clock not in CLOCKS:
+            raise ValueError("Unknown clock: {}".format(clock))
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.clock = clock
+        self.nodes = 0
+        self._timer = CLOCKS[clock]
+        self._start = self._timer()
+
+    def start(self):
+        """Restart the clock and the node count for a new turn, and return
+        the budget.
+        """
+        self.nodes = 0
+        self._start = self._timer()
+        return self
+
+    def elapsed(self):
+        """Return the number of milliseconds elapsed on the clock since
+        start().
+        """
+        return 1000 * (self._timer() - self._start)
+
+    def time_remaining(self):
+        """Return the number of milliseconds left before the time limit, or
+        infinity when the budget has no time limit. Does not count a node.
+        """
+        if self.time_limit is None:
+            return float("inf")
+        return self.time_limit - self.elapsed()
+
+    def nodes_remaining(self):
+        """Return the number of nodes left before the node limit, or infinity
+        when the budget has no node limit.
+        """
+        if self.node_limit is None:
+            return float("inf")
+        return self.node_limit - self.nodes
+
+    def charge(self, nodes):
+        """Count `nodes` nodes searched without calling the budget, e.g., by
+        worker processes.
+        """
+        self.nodes += nodes
+
+    def __call__(self):
+        """Count one node, and return the number of milliseconds left, or
+        minus infinity once the node limit is spent.
+        """
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            return float("-inf")
+        return self.time_remaining()
@@ -0,0 +1,196 @@
+"""
+This file contains an exact solver for the endgame of Isolation, once the
+players can no longer reach each other.
+
+When the cells reachable by knight moves from each player's location (its
+region) are disjoint, neither player can block the other anymore and the game
+reduces to two independent longest-path problems: each player should make the
+longest knight path within its own region, and the player with the
+initiative wins if and only if its path is strictly longer than its
+opponent's. The longest path is found by depth-first search on the bitmask
+representation of `BitBoard`, memoized on the (location, region) pair and
+pruned with an upper bound on the length of any path in the region reachable
+from each cell: knight moves always change the colour of the cell, so a path
+alternates between the light and dark cells of the region.
+"""
+from collections import namedtuple
+
+from .bitboard import board_geometry
+from .playout import board_to_state
+
+Partition = namedtuple("Partition", [
+    "own_location", "own_region", "opp_location", "opp_region"])
+Partition.__doc__ = """The cell index of the location of the player with the
+initiative and of its opponent, and the bitmasks of the free cells each of
+them can reach, see `partition`."""
+
+_COLOURINGS = {}
+
+
+def knight_region(masks, free, location):
+    """Return the bitmask of the cells of `free` reachable by a sequence of
+    knight moves from `location` through cells of `free`.
+
+    Parameters
+    ----------
+    masks : tuple<int>
+        The knight-move mask of every cell, see `board_geometry`.
+
+    free : int
+        The bitmask of the cells that can be visited.
+
+    location : int
+        The cell index of the starting location (not part of the region
+        unless it belongs to `free` and can be reached again).
+    """
+    region = 0
+    frontier = masks[location] & free
+    while frontier:
+        region |= frontier
+        reached = 0
+        while frontier:
+            low = frontier & -frontier
+            reached |= masks[low.bit_length() - 1]
+            frontier ^= low
+        frontier = reached & free & ~region
+    return region
+
+
+def knight_colouring(masks):
+    """Return the bitmask of the cells of one colour of the board whose
+    knight-move masks are `masks`; every knight move goes from a cell of the
+    mask to a cell outside of it, or the reverse.
+    """
+    colouring = _COLOURINGS.get(masks)
+    if colouring is None:
+        colouring = 0
+        coloured = 0
+        for start in range(len(masks)):
+            if coloured >> start & 1:
+                continue
+            colouring |= 1 << start
+            coloured |= 1 << start
+            stack = [start]
+            while stack:
+                idx = stack.pop()
+                same = colouring >> idx & 1
+                moves = masks[idx] & ~coloured
+                while moves:
+                    low = moves & -moves
+                    moves ^= low
+                    coloured |= low
+                    if not same:
+                        colouring |= low
+                    stack.append(low.bit_length() - 1)
+        _COLOURINGS[masks] = colouring
+    return colouring
+
+
+def partition(board):
+    """Return the `Partition` of the board for the player with the initiative
+    if both players are placed and their regions are disjoint, or None while
+    the players can still interfere with each other.
+
+    Parameters
+    ----------
+    board : isolation.Board
+        Any object implementing the `isolation.Board` API.
+    """
+    width, height, blocked, locations, turn = board_to_state(board)
+    own, opp = locations[turn], locations[turn ^ 1]
+    if own is None or opp is None:
+        return None
+    masks, _ = board_geometry(width, height)
+    free = ((1 << (width * height)) - 1) & ~blocked
+    own_region = knight_region(masks, free, own)
+    opp_region = knight_region(masks, free, opp)
+    if own_region & opp_region:
+        return None
+    return Partition(own, own_region, opp, opp_region)
+
+
+def longest_path(masks, region, location, check=None, cache=None):
+    """Return the number of moves of the longest knight path from `location`
+    visiting each cell of `region` at most once.
+
+    Parameters
+    ----------
+    masks : tuple<int>
+        The knight-move mask of every cell, see `board_geometry`.
+
+    region : int
+        The bitmask of the cells that can be visited.
+
+    location : int
+        The cell index of the starting location.
+
+    check : callable (optional)
+        Called without arguments at every position searched; it can stop the
+        search by raising an exception, e.g., when the time is up.
+
+    cache : dict (optional)
+        The memo of the lengths found, keyed by (location, reachable region).
+        Entries stay valid for every board of the same size, so a cache can
+        be kept from one search to the next.
+
+    Returns
+    -------
+    int
+        The number of moves of the longest path.
+    """
+    if cache is None:
+        cache = {}
+    colouring = knight_colouring(masks)
+    return _longest_path(masks, colouring,
+                         knight_region(masks, region, location), location,
+                         check, cache)
+
+
+def _path_bound(colouring, region, location):
+    """Return an upper bound of the number of moves of a path from `location`
+    through `region`, which alternates between the cells of the other colour
+    and the cells of the colour of `location`.
+    """
+    if colouring >> location & 1:
+        same = region & colouring
+    else:
+        same = region & ~colouring
+    other = bin(region ^ same).count("1")
+    return min(2 * other, 2 * bin(same).count("1") + 1)
+
+
+def _longest_path(masks, colouring, region, location, check, cache):
+    """Longest path from `location` through `region`, the region reachable
+    from it; see longest_path().
+    """
+    key = (location, region)
+    best = cache.get(key)
+    if best is not None:
+        return best
+    if check is not None:
+        check()
+
+    # try the moves with the fewest onward moves first (Warnsdorff's rule),
+    # which usually start the longest paths and tighten the pruning
+    children = []
+    moves = masks[location] & region
+    while moves:
+        low = moves & -moves
+        moves ^= low
+        idx = low.bit_length() - 1
+        children.append((bin(masks[idx] & region).count("1"), idx))
+    children.sort()
+
+    bound = _path_bound(colouring, region, location)
+    best = 0
+    for _, idx in children:
+        if best >= bound:
+            break
+        rest = knight_region(masks, region & ~(1 << idx), idx)
+        if 1 + _path_bound(colouring, rest, idx) <= best:
+            continue
+        length = 1 + _longest_path(masks, colouring, rest, idx, check, cache)
+        if length > best:
+            best = length
+    cache[key] = best
+    return best
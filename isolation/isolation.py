@@ -11,8 +11,79 @@ import random
 import timeit
 from copy import copy
 
+from .budget import SearchBudget
+from .zobrist import zobrist_keys, zobrist_hash
+
 TIME_LIMIT_MILLIS = 150
 
+# Knight-move offsets (row, column) from a cell
+DIRECTIONS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1))
+
+
+class Features(object):
+    """Features of a game state from the point of view of a player, returned
+    by `Board.features`.
+
+    Attributes
+    ----------
+    own_moves, opp_moves : frozenset<(int, int)>
+        The legal moves of the player and of its opponent, built on first
+        access from the move representation of the board.
+
+    own_mobility, opp_mobility : int
+        The number of legal moves of the player and of its opponent.
+
+    overlap : int
+        The number of legal moves the player and its opponent share.
+
+    is_winner, is_loser : bool
+        Whether the player has won or lost the game.
+
+    is_active : bool
+        Whether the player holds the initiative.
+
+    own_location, opp_location : (int, int) or None
+        The locations of the player and of its opponent.
+    """
+    __slots__ = ("own_mobility", "opp_mobility", "overlap", "is_winner",
+                 "is_loser", "is_active", "own_location", "opp_location",
+                 "_own_moves", "_opp_moves", "_to_moves")
+
+    def __init__(self, own_moves, opp_moves, own_mobility, opp_mobility,
+                 overlap, is_winner, is_loser, is_active, own_location,
+                 opp_location, to_moves=None):
+        self._own_moves = own_moves
+        self._opp_moves = opp_moves
+        self.own_mobility = own_mobility
+        self.opp_mobility = opp_mobility
+        self.overlap = overlap
+        self.is_winner = is_winner
+        self.is_loser = is_loser
+        self.is_active = is_active
+        self.own_location = own_location
+        self.opp_location = opp_location
+        # converts the move representation of the board to move pairs
+        self._to_moves = to_moves
+
+    @property
+    def own_moves(self):
+        if not isinstance(self._own_moves, frozenset):
+            moves = self._own_moves
+            if self._to_moves is not None:
+                moves = self._to_moves(moves)
+            self._own_moves = frozenset(moves)
+        return self._own_moves
+
+    @property
+    def opp_moves(self):
+        if not isinstance(self._opp_moves, frozenset):
+            moves = self._opp_moves
+            if self._to_moves is not None:
+                moves = self._to_moves(moves)
+            self._opp_moves = frozenset(moves)
+        return self._opp_moves
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -52,8 +123,40 @@ class Board(object):
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
 
+        # Moves applied with push_move(), stored as (cell index, previous
+        # location of the player that moved) so pop_move() can revert them
+        self._undo_stack = []
+
+        # Zobrist key of the current state, updated on every move
+        self._zobrist = zobrist_keys(width, height)
+        self._hash = 0
+
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the 64-bit Zobrist key of the current state, covering the
+        blocked cells, both player locations and the player to move. Keys are
+        maintained incrementally and are stable across processes.
+        """
+        return self._hash
+
+    def _compute_hash(self):
+        """Compute the Zobrist key of the current state from scratch."""
+        return zobrist_hash(
+            self.width, self.height,
+            [idx for idx in range(self.width * self.height)
+             if self._board_state[idx] != Board.BLANK],
+            (self._board_state[-1], self._board_state[-2]),
+            self._board_state[-3])
+
+    def _move_key(self, idx, player_idx, last_loc):
+        """Return the Zobrist key change of a player (0 for player 1, 1 for
+        player 2) moving from `last_loc` to cell `idx`.
+        """
+        blocked_keys, location_keys, turn_key = self._zobrist
+        location_keys = location_keys[player_idx]
+        key = blocked_keys[idx] ^ location_keys[idx] ^ turn_key
+        if last_loc is not Board.NOT_MOVED:
+            key ^= location_keys[last_loc]
+        return key
 
     @property
     def active_player(self):
@@ -97,8 +200,41 @@ class Board(object):
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
         new_board._board_state = copy(self._board_state)
+        new_board._hash = self._hash
+        return new_board
+
+    def with_players(self, players):
+        """Return a deep copy of the current board in which the registered
+        players are replaced.
+
+        Parameters
+        ----------
+        players : dict
+            Maps each player registered in the current game to the object
+            that takes its place in the copy.
+
+        Returns
+        -------
+        isolation.Board
+            A deep copy of the board registered with the new players.
+        """
+        new_board = self.copy()
+        new_board._player_1 = players[self._player_1]
+        new_board._player_2 = players[self._player_2]
+        new_board._active_player = players[self._active_player]
+        new_board._inactive_player = players[self._inactive_player]
         return new_board
 
+    def __getstate__(self):
+        # the Zobrist tables are shared per board size and rebuilt on load
+        state = self.__dict__.copy()
+        del state["_zobrist"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._zobrist = zobrist_keys(self.width, self.height)
+
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
         advance the game one ply.
@@ -190,6 +326,41 @@ class Board(object):
             player = self.active_player
         return self.__get_moves(self.get_player_location(player))
 
+    def features(self, player):
+        """Extract in a single pass the features of the current game state
+        used by heuristic evaluation functions, from the point of view of the
+        specified player.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        `isolation.Features`
+            The legal moves, mobility and location of the player and of its
+            opponent, the number of moves they share, and whether the player
+            holds the initiative, has won or has lost.
+        """
+        if player == self._player_1:
+            own_idx, opp_idx = self._board_state[-1], self._board_state[-2]
+        elif player == self._player_2:
+            own_idx, opp_idx = self._board_state[-2], self._board_state[-1]
+        else:
+            raise RuntimeError(
+                "Invalid player in features: {}".format(player))
+        own_location = self.__index_to_location(own_idx)
+        opp_location = self.__index_to_location(opp_idx)
+        own_moves = self.__get_move_set(own_location)
+        opp_moves = self.__get_move_set(opp_location)
+        is_active = player == self._active_player
+        return Features(
+            own_moves, opp_moves, len(own_moves), len(opp_moves),
+            len(set(own_moves).intersection(opp_moves)),
+            not is_active and not opp_moves, is_active and not own_moves,
+            is_active, own_location, opp_location)
+
     def apply_move(self, move):
         """Move the active player to a specified location.
 
@@ -201,12 +372,47 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        self._hash ^= self._move_key(idx, last_move_idx - 1,
+                                     self._board_state[-last_move_idx])
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
         self._board_state[-3] ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push_move(self, move):
+        """Move the active player to a specified location in-place, recording
+        the change so that it can be reverted by `pop_move()`.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._undo_stack.append((move[0] + move[1] * self.height,
+                                 self._board_state[-last_move_idx]))
+        self.apply_move(move)
+
+    def pop_move(self):
+        """Revert the last move applied with `push_move()`.
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the reverted move.
+        """
+        idx, last_loc = self._undo_stack.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        self._board_state[-3] ^= 1
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._hash ^= self._move_key(idx, last_move_idx - 1, last_loc)
+        self._board_state[-last_move_idx] = last_loc
+        self._board_state[idx] = Board.BLANK
+        return (idx % self.height, idx // self.height)
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
         return player == self._inactive_player and not self.get_legal_moves(self._active_player)
@@ -262,6 +468,23 @@ class Board(object):
         random.shuffle(valid_moves)
         return valid_moves
 
+    def __get_move_set(self, loc):
+        """Generate the possible moves from `loc` in no particular order."""
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        r, c = loc
+        state, height, width = self._board_state, self.height, self.width
+        return [(r + dr, c + dc) for dr, dc in DIRECTIONS
+                if 0 <= r + dr < height and 0 <= c + dc < width and
+                state[r + dr + (c + dc) * height] == Board.BLANK]
+
+    def __index_to_location(self, idx):
+        """Return the coordinate pair of a cell index, or None."""
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return (idx % self.height, idx // self.height)
+
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
         return self.to_string()
@@ -295,7 +518,8 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, node_limit=None,
+             clock="wall", callback=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -303,7 +527,22 @@ class Board(object):
         ----------
         time_limit : numeric (optional)
             The maximum number of milliseconds to allow before timeout
-            during each turn.
+            during each turn, or None to play without a clock.
+
+        node_limit : int (optional)
+            The maximum number of nodes each player may search during each
+            turn; see `isolation.SearchBudget`. Players do not forfeit for
+            exceeding a node limit.
+
+        clock : str (optional)
+            The clock measuring `time_limit`: 'wall' time, or the CPU time of
+            the 'process' or of the 'thread', which keeps the time limit fair
+            when games share the CPUs; see `isolation.SearchBudget`.
+
+        callback : callable (optional)
+            Called with the active player and the move it returned after
+            every move, including the last one, e.g., to record statistics
+            of the search of the players.
 
         Returns
         ----------
@@ -311,20 +550,28 @@ class Board(object):
             Return multiple including the winning player, the complete game
             move history, and a string indicating the reason for losing
             (e.g., timeout or invalid move).
+
+        The (clock, wall) milliseconds taken by each move, including the
+        last one, are recorded in the `move_timings` attribute.
         """
         move_history = []
+        self.move_timings = []
 
-        time_millis = lambda: 1000 * timeit.default_timer()
+        budget = SearchBudget(time_limit, node_limit, clock)
 
         while True:
 
             legal_player_moves = self.get_legal_moves()
             game_copy = self.copy()
 
-            move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
-            curr_move = self._active_player.get_move(game_copy, time_left)
-            move_end = time_left()
+            wall_start = timeit.default_timer()
+            curr_move = self._active_player.get_move(game_copy, budget.start())
+            move_end = budget.time_remaining()
+            self.move_timings.append((
+                budget.elapsed(),
+                1000 * (timeit.default_timer() - wall_start)))
+            if callback is not None:
+                callback(self._active_player, curr_move)
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
@@ -0,0 +1,205 @@
+"""
+This file contains a Monte Carlo playout engine that plays games of
+Isolation to the end as fast as possible, e.g., for Monte Carlo tree search,
+rollout-based heuristics or strength estimation.
+
+A playout works on the integer bitmask representation of `BitBoard`: the
+blocked cells, the cell index of each player's location and the player with
+the initiative. Unlike `Board.play`, it keeps no move history, makes no copy
+of the board and never checks the time.
+"""
+import multiprocessing
+import random
+import timeit
+
+from collections import namedtuple
+
+from .bitboard import BitBoard, board_geometry
+
+POLICIES = ("random", "greedy")
+
+PlayoutStats = namedtuple("PlayoutStats", [
+    "playouts", "wins", "seconds", "playouts_per_second"])
+PlayoutStats.__doc__ = """Results of `PlayoutEngine.run`: the number of
+playouts, the wins of player 1 and player 2 as a pair, the elapsed seconds
+and the number of playouts per second."""
+
+
+def board_to_state(board):
+    """Return the state of any object implementing the `isolation.Board` API
+    as a tuple (width, height, blocked, locations, turn), where `blocked` is
+    the bitmask of blocked cells, `locations` the pair of the cell index of
+    the location of player 1 and player 2 (None until placed), and `turn` 0
+    if player 1 has the initiative or 1 for player 2.
+    """
+    if not isinstance(board, BitBoard):
+        board = BitBoard.from_board(board)
+    return (board.width, board.height, board._blocked,
+            tuple(board._locations), board._turn)
+
+
+def simulate(masks, full, blocked, locations, turn, policy="random",
+             rng=random):
+    """Play a game to the end from the given state, both players following
+    `policy`, and return the winner.
+
+    Parameters
+    ----------
+    masks : tuple<int>
+        The knight-move mask of every cell, see `board_geometry`.
+
+    full : int
+        The bitmask of all the cells of the board.
+
+    blocked : int
+        The bitmask of the blocked cells.
+
+    locations : (int or None, int or None)
+        The cell index of the location of player 1 and player 2, or None if
+        the player has not moved.
+
+    turn : int
+        0 if player 1 has the initiative, 1 for player 2.
+
+    policy : str (optional)
+        'random' plays uniformly random legal moves; 'greedy' plays the move
+        leaving the player with the most legal moves, ties broken at random.
+
+    rng : random.Random (optional)
+        The random generator to draw the moves from.
+
+    Returns
+    -------
+    int
+        0 if player 1 wins, 1 if player 2 wins.
+    """
+    greedy = policy == "greedy"
+    randrange = rng.randrange
+    loc = list(locations)
+    while True:
+        own = loc[turn]
+        moves = full & ~blocked
+        if own is not None:
+            moves &= masks[own]
+        if not moves:
+            return turn ^ 1
+
+        bits = []
+        while moves:
+            low = moves & -moves
+            bits.append(low)
+            moves ^= low
+        if greedy and len(bits) > 1:
+            best = -1
+            for low in bits:
+                onward = bin(masks[low.bit_length() - 1] &
+                             ~(blocked | low)).count("1")
+                if onward > best:
+                    best, candidates = onward, [low]
+                elif onward == best:
+                    candidates.append(low)
+            bits = candidates
+        low = bits[randrange(len(bits))]
+
+        blocked |= low
+        loc[turn] = low.bit_length() - 1
+        turn ^= 1
+
+
+def _run_playouts(task):
+    """Run playouts from a board state in a pool worker.
+
+    Parameters
+    ----------
+    task : tuple
+        (state, playouts, policy, seed) where `state` is the result of
+        `board_to_state`.
+
+    Returns
+    -------
+    [int, int]
+        The wins of player 1 and player 2.
+    """
+    (width, height, blocked, locations, turn), playouts, policy, seed = task
+    masks, _ = board_geometry(width, height)
+    full = (1 << (width * height)) - 1
+    rng = random.Random(seed)
+    wins = [0, 0]
+    for _ in range(playouts):
+        wins[simulate(masks, full, blocked, locations, turn, policy, rng)] += 1
+    return wins
+
+
+class PlayoutEngine(object):
+    """Run batches of playouts from a board and report win statistics.
+
+    Parameters
+    ----------
+    policy : str (optional)
+        The move policy of both players, one of `POLICIES`; see simulate().
+
+    processes : int (optional)
+        If greater than 1, split the playouts of each run across a pool of
+        this many worker processes. The pool is started by start() (or on
+        the first run) and kept until close().
+
+    seed : int (optional)
+        Seed of the random generator of the playouts, for reproducible runs.
+    """
+
+    def __init__(self, policy="random", processes=1, seed=None):
+        if policy not in POLICIES:
+            raise ValueError("Unknown playout policy: {}".format(policy))
+        self.policy = policy
+        self.processes = processes
+        self._rng = random.Random(seed)
+        self._pool = None
+
+    def start(self):
+        """Start the worker processes, so that the startup cost is not
+        charged to the first run.
+        """
+        if self.processes > 1 and self._pool is None:
+            self._pool = multiprocessing.Pool(self.processes)
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def run(self, board, playouts):
+        """Play `playouts` games to the end from the state of `board`.
+
+        Parameters
+        ----------
+        board : isolation.Board
+            The starting position; the board itself is left unchanged.
+
+        playouts : int
+            The number of games to play.
+
+        Returns
+        -------
+        `PlayoutStats`
+            The wins of each player and the playout throughput.
+        """
+        state = board_to_state(board)
+        start = timeit.default_timer()
+        if self.processes > 1:
+            self.start()
+            chunks = [playouts // self.processes + (i < playouts %
+                                                    self.processes)
+                      for i in range(self.processes)]
+            results = self._pool.map(_run_playouts, [
+                (state, chunk, self.policy, self._rng.getrandbits(64))
+                for chunk in chunks if chunk])
+            wins = tuple(sum(result[p] for result in results)
+                         for p in range(2))
+        else:
+            wins = tuple(_run_playouts(
+                (state, playouts, self.policy, self._rng.getrandbits(64))))
+        seconds = timeit.default_timer() - start
+        return PlayoutStats(playouts, wins, seconds,
+                            playouts / seconds if seconds else float("inf"))
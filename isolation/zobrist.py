@@ -0,0 +1,92 @@
+"""
+This file contains the Zobrist key tables used by `isolation.Board` and
+`isolation.BitBoard` to maintain a position hash incrementally.
+
+A position key is the XOR of one random 64-bit key for each blocked cell, one
+key for the location of each player, and one key when player 2 holds the
+initiative, so applying or reverting a move only takes a few XOR operations.
+The tables are drawn from a private `random.Random` seeded with `seed`, so the
+keys of a position are identical in every process that uses the same seed
+(unlike the builtin `hash()` of strings, which is salted per process) and can
+be used to share caches between workers.
+"""
+import random
+
+ZOBRIST_SEED = 0x15014710
+
+_TABLES = {}
+
+
+def zobrist_keys(width, height, seed=ZOBRIST_SEED):
+    """Return the Zobrist key tables for a board of the given size.
+
+    The tables are built on first use and shared by every board with the same
+    dimensions and seed.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    seed : int (optional)
+        The seed of the random generator used to draw the keys.
+
+    Returns
+    -------
+    (tuple<int>, (tuple<int>, tuple<int>), int)
+        The key of every blocked cell, the location keys of player 1 and
+        player 2 indexed by cell index, and the key for player 2 to move.
+    """
+    tables = _TABLES.get((width, height, seed))
+    if tables is None:
+        rng = random.Random(seed)
+        cells = width * height
+        blocked = tuple(rng.getrandbits(64) for _ in range(cells))
+        locations = tuple(tuple(rng.getrandbits(64) for _ in range(cells))
+                          for _ in range(2))
+        tables = (blocked, locations, rng.getrandbits(64))
+        _TABLES[(width, height, seed)] = tables
+    return tables
+
+
+def zobrist_hash(width, height, blocked_cells, locations, turn,
+                 seed=ZOBRIST_SEED):
+    """Compute the Zobrist key of a position from scratch.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    blocked_cells : iterable<int>
+        The cell indices of every blocked cell (including player locations).
+
+    locations : (int or None, int or None)
+        The cell index of the location of player 1 and player 2, or None if
+        the player has not moved.
+
+    turn : int
+        0 if player 1 holds the initiative, 1 for player 2.
+
+    seed : int (optional)
+        The seed of the random generator used to draw the keys.
+
+    Returns
+    -------
+    int
+        The 64-bit Zobrist key of the position.
+    """
+    blocked_keys, location_keys, turn_key = zobrist_keys(width, height, seed)
+    key = turn_key if turn else 0
+    for idx in blocked_cells:
+        key ^= blocked_keys[idx]
+    for player_keys, idx in zip(location_keys, locations):
+        if idx is not None:
+            key ^= player_keys[idx]
+    return key
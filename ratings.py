@@ -0,0 +1,320 @@
+"""This file contains statistical tools to rate agents from the results of
+the games they play against each other, e.g., in tournament.py.
+
+Isolation games cannot be drawn, so every game is a win or a loss, and the
+expected score of an agent rated `elo` points above its opponent is the
+logistic function 1 / (1 + 10 ** (-elo / 400)).
+"""
+import math
+import random
+
+from statistics import NormalDist
+
+
+def elo_to_score(elo):
+    """Return the expected score of an agent rated `elo` points above its
+    opponent.
+    """
+    return 1. / (1. + 10 ** (-elo / 400.))
+
+
+def score_to_elo(score):
+    """Return the Elo difference corresponding to an expected score between
+    0 and 1 (infinite for a score of 0 or 1).
+    """
+    if score <= 0.:
+        return float("-inf")
+    if score >= 1.:
+        return float("inf")
+    return 400. * math.log10(score / (1. - score))
+
+
+def wilson_interval(wins, games, confidence=.95):
+    """Return the (low, high) Wilson score interval of the probability of
+    winning after `wins` wins in `games` games, at the given confidence
+    level.
+    """
+    if not games:
+        return 0., 1.
+    z = NormalDist().inv_cdf(.5 + confidence / 2.)
+    score = wins / games
+    scale = 1. + z * z / games
+    center = (score + z * z / (2. * games)) / scale
+    margin = z * math.sqrt(score * (1. - score) / games +
+                           z * z / (4. * games * games)) / scale
+    return max(0., center - margin), min(1., center + margin)
+
+
+class SPRT:
+    """Sequential probability ratio test of the Elo difference between two
+    agents, deciding between the hypotheses H0: the difference is `elo0` and
+    H1: the difference is `elo1` after as few games as possible.
+
+    Call update() with the result of every game, in any order, until
+    status() returns the accepted hypothesis. The log-likelihood ratio (LLR)
+    of H1 against H0 is accumulated over the games; H1 is accepted once it
+    reaches `upper_bound` and H0 once it falls to `lower_bound`.
+
+    Parameters
+    ----------
+    elo0, elo1 : float (optional)
+        The Elo difference of the first agent over the second under H0 and
+        under H1.
+
+    alpha : float (optional)
+        The probability of accepting H1 when H0 holds (false positive).
+
+    beta : float (optional)
+        The probability of accepting H0 when H1 holds (false negative).
+
+    Attributes
+    ----------
+    wins, losses : int
+        The number of games won and lost by the first agent.
+
+    llr : float
+        The log-likelihood ratio of the results so far.
+    """
+
+    def __init__(self, elo0=0., elo1=50., alpha=.05, beta=.05):
+        if elo0 >= elo1:
+            raise ValueError("elo1 must be greater than elo0")
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.lower_bound = math.log(beta / (1. - alpha))
+        self.upper_bound = math.log((1. - beta) / alpha)
+        self.wins = self.losses = 0
+        self.llr = 0.
+
+        p0, p1 = elo_to_score(elo0), elo_to_score(elo1)
+        self._win_llr = math.log(p1 / p0)
+        self._loss_llr = math.log((1. - p1) / (1. - p0))
+
+    @property
+    def games(self):
+        """The number of games counted."""
+        return self.wins + self.losses
+
+    def update(self, won):
+        """Count a game won (if `won` is True) or lost by the first agent,
+        and return status().
+        """
+        if won:
+            self.wins += 1
+            self.llr += self._win_llr
+        else:
+            self.losses += 1
+            self.llr += self._loss_llr
+        return self.status()
+
+    def status(self):
+        """Return 'H1' or 'H0' once a hypothesis is accepted, or None while
+        the test is undecided.
+        """
+        if self.llr >= self.upper_bound:
+            return "H1"
+        if self.llr <= self.lower_bound:
+            return "H0"
+        return None
+
+    def elo_interval(self, confidence=.95):
+        """Return the (low, estimate, high) Elo difference of the first agent
+        over the second, from the Wilson score interval of its score at the
+        given confidence level (so the bound toward the opponent stays finite
+        after all wins or all losses).
+        """
+        if not self.games:
+            return float("-inf"), 0., float("inf")
+        score = self.wins / self.games
+        low, high = wilson_interval(self.wins, self.games, confidence)
+        return score_to_elo(low), score_to_elo(score), score_to_elo(high)
+
+    def __str__(self):
+        low, elo, high = self.elo_interval()
+        return ("{:>5} games {:>4}-{:<4} LLR {:6.2f} [{:.2f}, {:.2f}]  "
+                "Elo {:+7.1f} ({:+.1f}, {:+.1f})").format(
+            self.games, self.wins, self.losses, self.llr, self.lower_bound,
+            self.upper_bound, elo, low, high)
+
+
+class RatingPool:
+    """Ratings with confidence intervals for a pool of agents, updated after
+    every game and used to pick the most informative next pairing.
+
+    Every agent has a Gaussian belief on its Elo rating, with mean `rating`
+    and standard deviation `deviation`, updated incrementally after each game
+    with the Glicko approximation of the Bradley-Terry (logistic Elo) model:
+    surprising results and uncertain opponents move a rating more, and every
+    game shrinks the deviation of both agents. The win counts of every pair
+    are kept as well, so that bradley_terry() can refit the ratings exactly
+    from all the results.
+
+    Parameters
+    ----------
+    agents : iterable (optional)
+        The names (or any hashable keys) of the agents of the pool; agents
+        can also be added later with add().
+
+    rating : float (optional)
+        The initial rating of every agent.
+
+    deviation : float (optional)
+        The initial rating deviation of every agent.
+    """
+    Q = math.log(10.) / 400.
+
+    def __init__(self, agents=(), rating=1500., deviation=350.):
+        self.initial_rating = rating
+        self.initial_deviation = deviation
+        self.ratings = {}
+        self.variances = {}
+        self.wins = {}
+        for agent in agents:
+            self.add(agent)
+
+    def __len__(self):
+        return len(self.ratings)
+
+    def __contains__(self, agent):
+        return agent in self.ratings
+
+    def add(self, agent):
+        """Add an agent to the pool with the initial rating, if it is not
+        already there.
+        """
+        if agent not in self.ratings:
+            self.ratings[agent] = self.initial_rating
+            self.variances[agent] = self.initial_deviation ** 2
+
+    def rating(self, agent):
+        """Return the rating of an agent."""
+        return self.ratings[agent]
+
+    def deviation(self, agent):
+        """Return the rating deviation (standard deviation) of an agent."""
+        return math.sqrt(self.variances[agent])
+
+    def interval(self, agent, confidence=.95):
+        """Return the (low, high) rating interval of an agent at the given
+        confidence level.
+        """
+        margin = NormalDist().inv_cdf(.5 + confidence / 2.) * \
+            self.deviation(agent)
+        return self.ratings[agent] - margin, self.ratings[agent] + margin
+
+    def games(self, agent=None):
+        """Return the number of games played by an agent, or in the pool."""
+        if agent is None:
+            return sum(self.wins.values())
+        return sum(count for pair, count in self.wins.items()
+                   if agent in pair)
+
+    def _impact(self, variance):
+        """Return the Glicko attenuation of a rating difference against an
+        opponent whose rating has the given variance.
+        """
+        return 1. / math.sqrt(1. + 3. * self.Q ** 2 * variance / math.pi ** 2)
+
+    def expected_score(self, agent, opponent):
+        """Return the expected score of `agent` against `opponent`, taking
+        the uncertainty of the opponent's rating into account.
+        """
+        impact = self._impact(self.variances[opponent])
+        diff = self.ratings[agent] - self.ratings[opponent]
+        return 1. / (1. + 10 ** (-impact * diff / 400.))
+
+    def _variance_after(self, agent, opponent):
+        """Return the variance of the rating of `agent` after one more game
+        against `opponent`, whatever its result.
+        """
+        impact = self._impact(self.variances[opponent])
+        expected = self.expected_score(agent, opponent)
+        information = self.Q ** 2 * impact ** 2 * expected * (1. - expected)
+        return 1. / (1. / self.variances[agent] + information)
+
+    def update(self, winner, loser):
+        """Update the ratings of two agents (added to the pool if needed)
+        after `winner` won a game against `loser`.
+        """
+        self.add(winner)
+        self.add(loser)
+        changes = {}
+        for agent, opponent, score in ((winner, loser, 1.),
+                                       (loser, winner, 0.)):
+            variance = self._variance_after(agent, opponent)
+            impact = self._impact(self.variances[opponent])
+            expected = self.expected_score(agent, opponent)
+            changes[agent] = (self.Q * variance * impact * (score - expected),
+                              variance)
+        for agent, (change, variance) in changes.items():
+            self.ratings[agent] += change
+            self.variances[agent] = variance
+        self.wins[(winner, loser)] = self.wins.get((winner, loser), 0) + 1
+
+    def next_pairing(self, rng=random, agents=None):
+        """Return the pair of agents whose next game is expected to reduce
+        the variance of their ratings the most, ties broken at random. Pairs
+        of agents with uncertain and close ratings are preferred. `agents`
+        restricts the choice to some of the agents of the pool.
+        """
+        agents = list(self.ratings if agents is None else agents)
+        if len(agents) < 2:
+            raise ValueError("A pairing needs at least two agents")
+        best_gain, best_pairs = float("-inf"), []
+        for i, agent in enumerate(agents):
+            for opponent in agents[i + 1:]:
+                gain = (self.variances[agent] +
+                        self.variances[opponent] -
+                        self._variance_after(agent, opponent) -
+                        self._variance_after(opponent, agent))
+                if gain > best_gain + 1e-9:
+                    best_gain, best_pairs = gain, [(agent, opponent)]
+                elif gain >= best_gain - 1e-9:
+                    best_pairs.append((agent, opponent))
+        return rng.choice(best_pairs)
+
+    def bradley_terry(self, iterations=100, prior_games=1.):
+        """Return the maximum a posteriori Bradley-Terry ratings of the agents
+        fitted to all the results so far with the minorization-maximization
+        algorithm, on the Elo scale and centered on the initial rating.
+
+        Every agent is credited with `prior_games` virtual games won and lost
+        against an agent of the initial rating, so that agents that won or
+        lost all their games keep finite ratings.
+        """
+        agents = list(self.ratings)
+        strengths = {agent: 1. for agent in agents}
+        wins = {agent: prior_games for agent in agents}
+        for (winner, _), count in self.wins.items():
+            wins[winner] += count
+        for _ in range(iterations):
+            updated = {}
+            for agent in agents:
+                total = 2. * prior_games / (strengths[agent] + 1.)
+                for (winner, loser), count in self.wins.items():
+                    if agent in (winner, loser):
+                        total += count / (strengths[winner] +
+                                          strengths[loser])
+                updated[agent] = wins[agent] / total
+            strengths = updated
+        return {agent: self.initial_rating + 400. * math.log10(strength)
+                for agent, strength in strengths.items()}
+
+    def standings(self, confidence=.95):
+        """Return the (agent, rating, low, high, games) rows of the pool from
+        the highest rating to the lowest.
+        """
+        return sorted(((agent, self.ratings[agent]) +
+                       self.interval(agent, confidence) +
+                       (self.games(agent),) for agent in self.ratings),
+                      key=lambda row: row[1], reverse=True)
+
+    def __str__(self):
+        lines = ["{:<16}{:>8}{:>18}{:>7}".format(
+            "Agent", "Rating", "95% interval", "Games")]
+        for agent, rating, low, high, games in self.standings():
+            lines.append("{!s:<16}{:>8.0f}{:>18}{:>7}".format(
+                agent, rating, "({:.0f}, {:.0f})".format(low, high), games))
+        return "\n".join(lines)
@@ -0,0 +1,186 @@
+"""This file contains the writers and readers of game records, which keep
+the moves and search statistics of every game played, e.g., in
+tournament.py, for later analysis or replay in isoviz/display.html.
+
+A record is a dict with the keys:
+
+    player1, player2 : the names of the players
+    width, height : the dimensions of the board
+    opening : the moves applied before the players took over
+    move_history : every move of the game as [row, column], opening
+        included (the moves list of isoviz/display.html)
+    winner : 1 if player 1 won, 2 if player 2 won
+    termination : the reason the game ended, see `isolation.Board.play`
+    clock : the clock of the time limit, see `isolation.SearchBudget`
+    move_latency_ms : the wall-clock milliseconds of every move after the
+        opening, including the last (losing) one
+    search_depths : the depth the player searched to for every move of
+        `move_latency_ms`, or None when unknown
+
+Records are streamed to a file one at a time as games finish, either as
+JSON Lines (one JSON object per line, which can be pasted or loaded into
+isoviz/display.html) or in a compact binary format (a few bytes per move)
+that read_records() converts back to the same dicts.
+"""
+import json
+import os
+import struct
+
+FORMATS = ("jsonl", "binary")
+
+# codes of the fields stored as a byte in the binary format
+TERMINATIONS = ("illegal move", "timeout", "forfeit")
+RECORD_CLOCKS = ("wall", "process", "thread")
+UNKNOWN_DEPTH = 255
+
+BINARY_MAGIC = b"ISOREC1\n"
+_HEADER = struct.Struct("<BBBBBBH")
+_LENGTH = struct.Struct("<I")
+
+
+def record_format(path, format=None):
+    """Return the format of the record file at `path`: `format` if given,
+    else 'binary' for the '.bin' extension and 'jsonl' otherwise.
+    """
+    if format is None:
+        format = ("binary" if os.path.splitext(path)[1] == ".bin"
+                  else "jsonl")
+    if format not in FORMATS:
+        raise ValueError("Unknown record format: {}".format(format))
+    return format
+
+
+def encode_record(record):
+    """Return the binary encoding of a record, without its length prefix.
+
+    Moves are stored as one byte cell indices (`row + column * height`),
+    latencies in microseconds on four bytes and search depths on one byte,
+    so boards are limited to 255 cells and depths to 254.
+    """
+    height = record["height"]
+    moves = record["move_history"]
+    latencies = record["move_latency_ms"]
+    names = [record["player" + str(p)].encode("utf-8") for p in (1, 2)]
+    header = _HEADER.pack(
+        record["width"], height, record["winner"],
+        TERMINATIONS.index(record["termination"]),
+        RECORD_CLOCKS.index(record["clock"]), len(record["opening"]),
+        len(moves))
+    parts = [header]
+    for name in names:
+        parts.append(struct.pack("<B", len(name)) + name)
+    parts.append(bytes(r + c * height for r, c in moves))
+    parts.append(struct.pack("<H", len(latencies)))
+    parts.append(struct.pack("<{}I".format(len(latencies)), *(
+        int(round(1000 * ms)) for ms in latencies)))
+    parts.append(bytes(UNKNOWN_DEPTH if depth is None else
+                       min(depth, UNKNOWN_DEPTH - 1)
+                       for depth in record["search_depths"]))
+    return b"".join(parts)
+
+
+def decode_record(data):
+    """Return the record of its binary encoding; see encode_record()."""
+    (width, height, winner, termination, clock, openings,
+     num_moves) = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    names = []
+    for _ in range(2):
+        size = data[offset]
+        names.append(data[offset + 1:offset + 1 + size].decode("utf-8"))
+        offset += 1 + size
+    moves = [[idx % height, idx // height]
+             for idx in data[offset:offset + num_moves]]
+    offset += num_moves
+    num_latencies, = struct.unpack_from("<H", data, offset)
+    offset += 2
+    latencies = struct.unpack_from("<{}I".format(num_latencies), data, offset)
+    offset += 4 * num_latencies
+    depths = data[offset:offset + num_latencies]
+    return {
+        "player1": names[0], "player2": names[1],
+        "width": width, "height": height,
+        "opening": moves[:openings], "move_history": moves,
+        "winner": winner, "termination": TERMINATIONS[termination],
+        "clock": RECORD_CLOCKS[clock],
+        "move_latency_ms": [us / 1000. for us in latencies],
+        "search_depths": [None if depth == UNKNOWN_DEPTH else depth
+                          for depth in depths]}
+
+
+class GameRecordWriter:
+    """Stream game records to a file as they are written, so that the
+    records of a tournament never have to be held in memory.
+
+    Every record is flushed as soon as it is written, so the file can be
+    read while the games go on, and the records of a run that is stopped
+    are kept.
+
+    Parameters
+    ----------
+    path : str
+        The file to write; an existing file is appended to.
+
+    format : str (optional)
+        'jsonl' or 'binary'; by default inferred from `path`, see
+        record_format().
+
+    Attributes
+    ----------
+    count : int
+        The number of records written.
+    """
+
+    def __init__(self, path, format=None):
+        self.path = path
+        self.format = record_format(path, format)
+        self.count = 0
+        if self.format == "binary":
+            new_file = not os.path.exists(path) or not os.path.getsize(path)
+            self._file = open(path, "ab")
+            if new_file:
+                self._file.write(BINARY_MAGIC)
+        else:
+            self._file = open(path, "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        """Append a record to the file."""
+        if self.format == "binary":
+            data = encode_record(record)
+            self._file.write(_LENGTH.pack(len(data)) + data)
+        else:
+            self._file.write(json.dumps(record, separators=(",", ":")) +
+                             "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+
+def read_records(path, format=None):
+    """Yield the records of a file written by `GameRecordWriter` one at a
+    time; see record_format() for `format`.
+    """
+    if record_format(path, format) == "binary":
+        with open(path, "rb") as record_file:
+            if record_file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError("Not a binary record file: {}".format(path))
+            while True:
+                prefix = record_file.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    return
+                size, = _LENGTH.unpack(prefix)
+                yield decode_record(record_file.read(size))
+    else:
+        with open(path, encoding="utf-8") as record_file:
+            for line in record_file:
+                if line.strip():
+                    yield json.loads(line)
@@ -59,13 +59,15 @@ def open_move_score(game, player):
     float
         The heuristic value of the current game state
     """
-    if game.is_loser(player):
+    features = game.features(player)
+
+    if features.is_loser:
         return float("-inf")
 
-    if game.is_winner(player):
+    if features.is_winner:
         return float("inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(features.own_mobility)
 
 
 def improved_score(game, player):
@@ -89,15 +91,15 @@ def improved_score(game, player):
     float
         The heuristic value of the current game state
     """
-    if game.is_loser(player):
+    features = game.features(player)
+
+    if features.is_loser:
         return float("-inf")
 
-    if game.is_winner(player):
+    if features.is_winner:
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
-    return float(own_moves - opp_moves)
+    return float(features.own_mobility - features.opp_mobility)
 
 
 def center_score(game, player):
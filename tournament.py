@@ -12,16 +12,22 @@ once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
 import itertools
+import multiprocessing
+import os
 import random
+import timeit
 import warnings
 
 from collections import namedtuple
 
 from isolation import Board
+from ratings import SPRT, RatingPool
+from records import GameRecordWriter
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
 from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+                        custom_score_2, custom_score_3, MOVE_ORDERINGS,
+                        TranspositionTable)
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -35,31 +41,215 @@ Iterative Deepening and the custom_score function defined in game_agent.py.
 Agent = namedtuple("Agent", ["player", "name"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
-    """Compare the test agents to the cpu agent in "fair" matches.
+def tournament_processes():
+    """Return the default number of worker processes of a parallel
+    tournament: one less than the number of CPUs this process may run on, so
+    that the parent and the clocks of the agents keep a core, and at least 1.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    return max(1, cpus - 1)
 
-    "Fair" matches use random starting locations and force the agents to
-    play as both first and second player to control for advantages resulting
-    from choosing better opening moves or having first initiative to move.
+
+def _init_tournament_worker(counter, pin_cores):
+    """Initialize a tournament pool worker, pinning it to a core of its own
+    if `pin_cores` is True. Workers take the usable cores from the last one,
+    leaving the first one to the parent when there are enough.
     """
-    timeout_count = 0
-    forfeit_count = 0
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[-1 - index % len(cores)]})
+
+
+def _search_depth(player):
+    """Return the depth of the last search of a player, or None if the
+    player does not report it.
+    """
+    player = getattr(player, "engine", player)
+    depth_nodes = getattr(player, "depth_nodes", None)
+    if depth_nodes:
+        return depth_nodes[-1][0]
+    if isinstance(player, MinimaxPlayer):
+        return player.search_depth
+    return None
+
+
+def _owns_workers(player):
+    """Return True if `player`, or its search `engine`, starts worker
+    processes of its own (parallel search, pondering, parallel playouts),
+    which the daemonic workers of a tournament pool cannot do.
+    """
+    for obj in (player, getattr(player, "engine", None)):
+        if getattr(obj, "ponder", None) or getattr(obj, "processes", 1) > 1:
+            return True
+    return False
+
+
+def _play_game(task):
+    """Play a game to the end, in a pool worker or in this process.
+
+    Parameters
+    ----------
+    task : tuple
+        (game, time_limit, node_limit, clock, seed, opening); the moves of
+        the game are drawn from the `random` module seeded with `seed`,
+        whose state is restored afterwards, so a game plays the same
+        wherever it is scheduled. `opening` lists the moves applied to the
+        game before.
+
+    The workers of the players (see `game_agent.AlphaBetaPlayer.start`) are
+    started before the game, so that their startup is not charged to the
+    first move, and stopped after it.
+
+    Returns
+    -------
+    (int, str, tuple, dict)
+        0 if player 1 won or 1 if player 2 won, the termination reason, the
+        timing of the game as (moves, clock milliseconds of the moves, wall
+        milliseconds of the moves, wall milliseconds of the game), and its
+        record without the names of the players; see `records`.
+    """
+    game, time_limit, node_limit, clock, seed, opening = task
+    players = (game._player_1, game._player_2)
+    depths = []
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        for player in players:
+            if hasattr(player, "start"):
+                player.start()
+        start = timeit.default_timer()
+        winner, move_history, termination = game.play(
+            time_limit=time_limit, node_limit=node_limit, clock=clock,
+            callback=lambda player, _: depths.append(_search_depth(player)))
+    finally:
+        random.setstate(state)
+        for player in players:
+            if hasattr(player, "close"):
+                player.close()
+    timing = (len(game.move_timings),
+              sum(clock_ms for clock_ms, _ in game.move_timings),
+              sum(wall_ms for _, wall_ms in game.move_timings),
+              1000 * (timeit.default_timer() - start))
+    winner_idx = int(winner is not game._player_1)
+    record = {
+        "width": game.width, "height": game.height,
+        "opening": [list(move) for move in opening],
+        "move_history": [list(move) for move in opening] + move_history,
+        "winner": winner_idx + 1, "termination": termination, "clock": clock,
+        "move_latency_ms": [round(wall_ms, 3)
+                            for _, wall_ms in game.move_timings],
+        "search_depths": depths}
+    return winner_idx, termination, timing, record
+
+
+def _play_indexed_game(item):
+    """Play the (index, task) game `item` with `_play_game`, and return the
+    index with the result.
+    """
+    index, task = item
+    return index, _play_game(task)
+
+
+def _play_games(tasks, pool=None):
+    """Play the games of `tasks` with `_play_game`, on the workers of `pool`
+    if given, and yield their (index, result) pairs as the games finish.
+
+    Games with a player that starts workers of its own (see
+    `_owns_workers`) are played in this process, while the pool plays the
+    others.
+    """
+    if pool is None:
+        for index, task in enumerate(tasks):
+            yield index, _play_game(task)
+        return
+    local, remote = [], []
+    for item in enumerate(tasks):
+        game = item[1][0]
+        if _owns_workers(game._player_1) or _owns_workers(game._player_2):
+            local.append(item)
+        else:
+            remote.append(item)
+    pending = pool.imap_unordered(_play_indexed_game, remote, chunksize=1)
+    for item in local:
+        yield _play_indexed_game(item)
+    for item in pending:
+        yield item
+
+
+def _play_round_games(tasks, pool=None, records=None, agents=()):
+    """Return the list of the `_play_game` results of `tasks` in order,
+    without the records of the games; see `_play_games`. With a
+    `records.GameRecordWriter` as `records`, the record of every game is
+    written as soon as the game is over, naming the players after the
+    `agents` playing them.
+    """
+    names = {agent.player: agent.name for agent in agents}
+    results = [None] * len(tasks)
+    for index, result in _play_games(tasks, pool):
+        if records is not None:
+            _write_record(records, names, tasks[index][0], result[3])
+        results[index] = result[:3]
+    return results
+
+
+def _schedule_round(cpu_agent, test_agents, num_matches, board_cls,
+                    node_limit, clock):
+    """Return the games of the matches of play_round() from their random
+    openings, and the tasks of `_play_game` to play them.
+    """
+    time_limit = TIME_LIMIT if node_limit is None else None
+    matches = []
+    tasks = []
     for _ in range(num_matches):
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
+        games = sum([[board_cls(cpu_agent.player, agent.player),
+                      board_cls(agent.player, cpu_agent.player)]
                      for agent in test_agents], [])
 
         # initialize all games with a random move and response
+        opening = []
         for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
+            opening.append(random.choice(games[0].get_legal_moves()))
             for game in games:
-                game.apply_move(move)
+                game.apply_move(opening[-1])
+
+        matches.append(games)
+        tasks.extend((game, time_limit, node_limit, clock,
+                      random.getrandbits(64), opening) for game in games)
+    return matches, tasks
+
+
+def _write_record(records, names, game, record):
+    """Write the `_play_game` record of `game` with the `GameRecordWriter`
+    `records`, naming the players after `names`, a dict of the names of the
+    players.
+    """
+    records.write(dict(player1=names[game._player_1],
+                       player2=names[game._player_2], **record))
 
-        # play all games and tally the results
+
+def _tally_round(matches, results, test_agents, win_counts, timings=None):
+    """Add the `_play_game` results (without records) of the games of
+    `matches` to
+    `win_counts`, and their timings to the `timings` list if given, and
+    return the timeout and forfeit counts.
+    """
+    timeout_count = 0
+    forfeit_count = 0
+    results = iter(results)
+    for games in matches:
         for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
+            winner_idx, termination, timing = next(results)
+            winner = (game._player_1, game._player_2)[winner_idx]
             win_counts[winner] += 1
+            if timings is not None:
+                timings[:] = [a + b for a, b in zip(timings, timing)]
 
         if termination == "timeout":
             timeout_count += 1
@@ -69,18 +259,136 @@ def play_round(cpu_agent, test_agents, win_counts, num_matches):
     return timeout_count, forfeit_count
 
 
+def play_round(cpu_agent, test_agents, win_counts, num_matches,
+               board_cls=Board, node_limit=None, pool=None, clock="wall",
+               timings=None, records=None):
+    """Compare the test agents to the cpu agent in "fair" matches.
+
+    "Fair" matches use random starting locations and force the agents to
+    play as both first and second player to control for advantages resulting
+    from choosing better opening moves or having first initiative to move.
+
+    `board_cls` selects the game engine (e.g., `isolation.BitBoard`). If
+    `node_limit` is given, every turn is limited to that many search nodes
+    instead of `TIME_LIMIT` milliseconds, see `isolation.SearchBudget`. If
+    a `multiprocessing.Pool` is given as `pool`, the games are played in its
+    workers, each on its own copy of the players, except the games of
+    players starting worker processes of their own (e.g., parallel search
+    or pondering), which are played in this process.
+
+    `clock` selects the clock of the time limit, see `isolation.Board.play`;
+    with a list of four numbers as `timings`, the number of moves, their
+    milliseconds on the clock and wall-clock, and the wall-clock
+    milliseconds of the whole games are added to it.
+
+    With a `records.GameRecordWriter` as `records`, the record of every
+    game (moves, winner, move latencies and search depths) is written to
+    it as soon as the game is over; see `records` for the fields.
+    """
+    matches, tasks = _schedule_round(cpu_agent, test_agents, num_matches,
+                                     board_cls, node_limit, clock)
+    results = _play_round_games(tasks, pool, records,
+                                [cpu_agent] + list(test_agents))
+    return _tally_round(matches, results, test_agents, win_counts, timings)
+
+
+def print_timings(timings, clock):
+    """Print the timing overhead observed in a tournament from the totals
+    accumulated by play_round(): the time the moves spent off the clock
+    (e.g., waiting for a core when timed on CPU time) and the time the games
+    spent outside of the moves of the agents.
+    """
+    moves, clock_ms, wall_ms, game_ms = timings
+    if not moves:
+        return
+    print(("Timing ({} clock): {:.1f} ms per move on the clock, {:.1f} ms " +
+           "wall-clock; {:.1f}% of the move time off the clock, {:.1f}% of " +
+           "the game time outside the moves\n").format(
+        clock, clock_ms / moves, wall_ms / moves,
+        100 * max(0., wall_ms - clock_ms) / wall_ms if wall_ms else 0.,
+        100 * (game_ms - wall_ms) / game_ms if game_ms else 0.))
+
+
 def update(total_wins, wins):
     for player in total_wins:
         total_wins[player] += wins[player]
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, board_cls=Board,
+                 node_limit=None, processes=None, clock="wall",
+                 pin_cores=False, record_path=None):
+    """Play matches between the test agent and each cpu_agent individually;
+    see `play_round` for `board_cls` and `node_limit`.
+
+    With `processes` greater than 1, the games of every round are scheduled
+    at once on a pool of that many worker processes, and the results are
+    tallied and printed round by round as in a serial run. The default,
+    `tournament_processes()`, leaves a CPU free so that the agents keep
+    their time limits. Each game is played on a copy of the players, so the
+    agents do not carry state (e.g., transposition tables) from one game to
+    the next; the games of agents starting worker processes of their own
+    are played in this process, see `play_round`.
+
+    `clock` selects the clock of the time limit: 'wall', or 'process' or
+    'thread' CPU time so that games sharing the CPUs do not lose on time
+    while waiting for a core; see `isolation.Board.play`. With `pin_cores`,
+    every worker process is pinned to a core (on systems supporting
+    `os.sched_setaffinity`). The timing overhead observed is printed after
+    the win table, see print_timings().
+
+    With a `record_path`, the record of every game is appended to that
+    file as soon as the game is over, in JSON Lines or, for a '.bin' file,
+    in the compact binary format; see `records.GameRecordWriter`. Records
+    are not kept once written.
+    """
+    if processes is None:
+        processes = tournament_processes()
+    pool = None
+    records = None
+    if processes > 1:
+        pool = multiprocessing.Pool(
+            processes, _init_tournament_worker,
+            (multiprocessing.Value("i", 0), pin_cores))
+    try:
+        if record_path is not None:
+            records = GameRecordWriter(record_path)
+        _play_matches(cpu_agents, test_agents, num_matches, board_cls,
+                      node_limit, pool, clock, records)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if records is not None:
+            records.close()
+
+
+def _play_matches(cpu_agents, test_agents, num_matches, board_cls,
+                  node_limit, pool, clock, records=None):
+    """Play and print the matches of play_matches() with the worker `pool`,
+    or in this process if it is None, writing the game records to the
+    `records` writer if given.
+    """
+    rounds = []
+    tasks = []
+    for agent in cpu_agents:
+        matches, round_tasks = _schedule_round(
+            agent, test_agents, num_matches, board_cls, node_limit, clock)
+        rounds.append((matches, [None] * len(round_tasks)))
+        tasks.extend(round_tasks)
+    # the games of every round are played at once; the record of each game
+    # is written as soon as it is over, and each round is tallied as soon
+    # as its games are
+    names = {agent.player: agent.name for agent in cpu_agents + test_agents}
+    round_size = len(tasks) // len(cpu_agents)
+    unfinished = [round_size] * len(cpu_agents)
+    games = _play_games(tasks, pool)
+
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
     total_matches = 2 * num_matches * len(cpu_agents)
+    timings = [0, 0., 0., 0.]
 
     print("\n{:^9}{:^13}{:^13}{:^13}{:^13}{:^13}".format(
         "Match #", "Opponent", test_agents[0].name, test_agents[1].name,
@@ -97,7 +405,15 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        while unfinished[idx]:
+            index, result = next(games)
+            if records is not None:
+                _write_record(records, names, tasks[index][0], result[3])
+            round_idx, game_idx = divmod(index, round_size)
+            rounds[round_idx][1][game_idx] = result[:3]
+            unfinished[round_idx] -= 1
+        matches, results = rounds[idx]
+        counts = _tally_round(matches, results, test_agents, wins, timings)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -113,6 +429,7 @@ def play_matches(cpu_agents, test_agents, num_matches):
         *["{:.1f}%".format(100 * total_wins[a.player] / total_matches)
           for a in test_agents]
     ))
+    print_timings(timings, clock)
 
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
@@ -124,6 +441,198 @@ def play_matches(cpu_agents, test_agents, num_matches):
                "legal moves available to play.\n").format(total_forfeits))
 
 
+def play_sprt_match(test_agent, cpu_agent, sprt=None, max_games=1000,
+                    board_cls=Board, node_limit=None, clock="wall",
+                    pool=None, pairs_per_step=1, verbose=True, records=None):
+    """Play "fair" pairs of games (see `play_round`) between the test agent
+    and the cpu agent until a sequential probability ratio test accepts a
+    hypothesis on their Elo difference, or `max_games` games are played.
+
+    After every step of `pairs_per_step` pairs, the live log-likelihood
+    ratio, its bounds and the Elo interval of the test agent are printed if
+    `verbose` is True. With a `multiprocessing.Pool` as `pool`, the games of
+    a step are played in parallel (set `pairs_per_step` to the number of
+    workers), and the test stops at the end of the step that decides it.
+    See `play_round` for `board_cls`, `node_limit`, `clock` and `records`.
+
+    Parameters
+    ----------
+    sprt : `ratings.SPRT` (optional)
+        The test to update, by default `SPRT()`: 0 against 50 Elo with 5%
+        error rates.
+
+    Returns
+    -------
+    `ratings.SPRT`
+        The test, whose status() is 'H1' if the test agent is stronger by
+        `sprt.elo1`, 'H0' if not stronger than `sprt.elo0`, or None if
+        `max_games` ran out first.
+    """
+    if sprt is None:
+        sprt = SPRT()
+    if verbose:
+        print("{} vs {}: H0 Elo {:+.0f}, H1 Elo {:+.0f}".format(
+            test_agent.name, cpu_agent.name, sprt.elo0, sprt.elo1))
+    while sprt.status() is None and sprt.games < max_games:
+        pairs = max(1, min(pairs_per_step, (max_games - sprt.games) // 2))
+        matches, tasks = _schedule_round(cpu_agent, [test_agent], pairs,
+                                         board_cls, node_limit, clock)
+        results = _play_round_games(tasks, pool, records,
+                                    [cpu_agent, test_agent])
+        games = [game for games in matches for game in games]
+        for game, (winner_idx, _, _) in zip(games, results):
+            winner = (game._player_1, game._player_2)[winner_idx]
+            sprt.update(winner is test_agent.player)
+        if verbose:
+            print(sprt, flush=True)
+    if verbose:
+        print("{} after {} games\n".format(
+            {"H1": "H1 accepted", "H0": "H0 accepted"}.get(
+                sprt.status(), "Undecided"), sprt.games))
+    return sprt
+
+
+def play_rating_pool(agents, num_pairs, rating_pool=None, board_cls=Board,
+                     node_limit=None, clock="wall", pool=None,
+                     pairs_per_step=1, verbose=True, records=None):
+    """Rate a pool of agents by playing `num_pairs` "fair" pairs of games (see
+    `play_round`), each between the two agents whose next game is the most
+    informative for their ratings, instead of a full round-robin.
+
+    The ratings are updated after every game. With a `multiprocessing.Pool`
+    as `pool`, every step plays `pairs_per_step` pairs between the chosen
+    agents in parallel. See `play_round` for `board_cls`, `node_limit`,
+    `clock` and `records`.
+
+    Parameters
+    ----------
+    agents : list<Agent>
+        The agents to rate, with distinct names and distinct player objects.
+
+    rating_pool : `ratings.RatingPool` (optional)
+        The ratings to update, keyed by agent name; a new pool by default.
+        Passing the pool of an earlier run continues rating from its
+        results, and new agents can join it.
+
+    Returns
+    -------
+    `ratings.RatingPool`
+        The updated ratings; the standings are printed if `verbose` is True.
+    """
+    if rating_pool is None:
+        rating_pool = RatingPool()
+    by_name = {agent.name: agent for agent in agents}
+    for name in by_name:
+        rating_pool.add(name)
+
+    pairs = 0
+    while pairs < num_pairs:
+        first, second = (by_name[name] for name in
+                         rating_pool.next_pairing(agents=by_name))
+        step = min(pairs_per_step, num_pairs - pairs)
+        matches, tasks = _schedule_round(second, [first], step, board_cls,
+                                         node_limit, clock)
+        results = _play_round_games(tasks, pool, records, [second, first])
+        games = [game for games in matches for game in games]
+        for game, (winner_idx, _, _) in zip(games, results):
+            if (game._player_1, game._player_2)[winner_idx] is first.player:
+                rating_pool.update(first.name, second.name)
+            else:
+                rating_pool.update(second.name, first.name)
+        pairs += step
+        if verbose:
+            print("{:>6} games: {} vs {}".format(
+                rating_pool.games(), first.name, second.name), flush=True)
+
+    if verbose:
+        print("\n{}\n".format(rating_pool))
+    return rating_pool
+
+
+def compare_move_orderings(orderings=tuple(MOVE_ORDERINGS), num_positions=20,
+                           max_depth=7, score_fn=improved_score,
+                           board_cls=Board):
+    """Print the average number of nodes `AlphaBetaPlayer` visits to complete
+    each search depth with each move ordering strategy.
+
+    Every strategy searches the same positions, reached by playing six random
+    moves from an empty board, with iterative deepening up to `max_depth`.
+    """
+    openings = []
+    for _ in range(num_positions):
+        game = board_cls("player 1", "player 2")
+        moves = []
+        for _ in range(6):
+            moves.append(random.choice(game.get_legal_moves()))
+            game.apply_move(moves[-1])
+        openings.append(moves)
+
+    print("{:^16}".format("Ordering") + "".join(
+        "{:^9}".format("d={}".format(d)) for d in range(1, max_depth + 1)))
+    for name in orderings:
+        nodes = [0] * max_depth
+        for moves in openings:
+            player = AlphaBetaPlayer(score_fn=score_fn, move_ordering=name)
+            player.time_left = lambda: float("inf")
+            game = board_cls(player, "player 2")
+            for move in moves:
+                game.apply_move(move)
+            for depth in range(1, max_depth + 1):
+                player.alphabeta(game, depth)
+                nodes[depth - 1] += player.nodes
+        print("{:^16}".format(name) + "".join(
+            "{:^9.0f}".format(n / len(openings)) for n in nodes))
+
+
+def measure_lazy_smp_speedup(worker_counts=(1, 2, 4), num_positions=5,
+                             max_depth=7, score_fn=improved_score,
+                             board_cls=Board):
+    """Print and return the average time `AlphaBetaPlayer` takes to complete
+    iterative deepening up to `max_depth` with each number of Lazy SMP
+    workers, and the speedup relative to the first entry of `worker_counts`.
+
+    Every worker count searches the same positions, reached by playing six
+    random moves from an empty board, with a fresh transposition table.
+
+    Returns
+    -------
+    dict
+        A (seconds, speedup) pair for each worker count.
+    """
+    openings = []
+    for _ in range(num_positions):
+        game = board_cls("player 1", "player 2")
+        moves = []
+        for _ in range(6):
+            moves.append(random.choice(game.get_legal_moves()))
+            game.apply_move(moves[-1])
+        openings.append(moves)
+
+    results = {}
+    print("{:^9}{:^12}{:^9}".format("Workers", "Time (s)", "Speedup"))
+    for workers in worker_counts:
+        elapsed = 0.
+        for moves in openings:
+            player = AlphaBetaPlayer(
+                score_fn=score_fn, transposition_table=TranspositionTable(),
+                move_ordering="killer_history", processes=workers,
+                parallel="lazy_smp")
+            player.start()
+            game = board_cls(player, "player 2")
+            for move in moves:
+                game.apply_move(move)
+            start = timeit.default_timer()
+            player.get_move(game, lambda: (
+                float("inf") if len(player.depth_nodes) < max_depth else 0))
+            elapsed += timeit.default_timer() - start
+            player.close()
+        elapsed /= len(openings)
+        speedup = results[worker_counts[0]][0] / elapsed if results else 1.
+        results[workers] = (elapsed, speedup)
+        print("{:^9}{:^12.3f}{:^9.2f}".format(workers, elapsed, speedup))
+    return results
+
+
 def main():
 
     # Define two agents to compare -- these agents will play from the same